@@ -2,11 +2,25 @@ from http.server import BaseHTTPRequestHandler
 import json
 import os
 import sys
-import tempfile
+import io
 import base64
-import uuid
+import functools
+import hashlib
+import importlib
+import importlib.util
+import itertools
+import logging
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
 import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+logger = logging.getLogger(__name__)
 
 # Import do cgi - pode não estar disponível em algumas versões
 try:
@@ -15,44 +29,658 @@ try:
 except ImportError:
     CGI_AVAILABLE = False
 
+# streaming-form-data faz o parse de multipart em C, lendo o corpo em blocos
+# (cgi.FieldStorage é depreciado e foi removido no Python 3.13)
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.parser import ParseFailedException
+    from streaming_form_data.targets import BaseTarget
+    STREAMING_FORM_DATA_AVAILABLE = True
+except ImportError:
+    STREAMING_FORM_DATA_AVAILABLE = False
+
+if STREAMING_FORM_DATA_AVAILABLE:
+    class _FormPartsTarget(BaseTarget):
+        """
+        Target único registrado para qualquer campo do multipart (via match_any):
+        guarda (nome, filename, bytes) de cada parte, na ordem em que chegam.
+        """
+        
+        def __init__(self):
+            super().__init__()
+            self.parts = []
+            self._name = None
+            self._chunks = []
+        
+        def match_any(self, registered_name, part_name):
+            """Aceita qualquer campo e guarda o nome da parte que vai começar"""
+            self._name = part_name
+            return True
+        
+        def on_start(self):
+            self._chunks = []
+        
+        def on_data_received(self, chunk):
+            self._chunks.append(chunk)
+        
+        def on_finish(self):
+            self.parts.append((self._name, self.multipart_filename, b''.join(self._chunks)))
+            # O parser só define o filename nas partes que o têm
+            self.multipart_filename = None
+
+# pybase64 usa SIMD (SSSE3/AVX2) e é bem mais rápido para PDFs grandes
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+_b64encode = pybase64.b64encode if PYBASE64_AVAILABLE else base64.b64encode
+_b64decode = pybase64.b64decode if PYBASE64_AVAILABLE else base64.b64decode
+
+# xxh128 é bem mais rápido que os hashes do hashlib para a chave do cache de PDFs
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# orjson serializa direto para bytes UTF-8 e é bem mais rápido que o json da stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    _loads = json.loads
+    # json.dumps com argumentos cria um JSONEncoder novo a cada chamada;
+    # o encoder é montado uma vez só e reaproveitado. Separadores compactos,
+    # como no orjson
+    _json_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    
+    def _dumps(obj):
+        """Serializa em JSON UTF-8 (fallback da stdlib)"""
+        return _json_encode(obj).encode('utf-8')
+
+# Nomes de arquivo padrão: base fixa por processo + contador, sem ler
+# /dev/urandom a cada requisição (o nome não precisa ser imprevisível)
+_NAME_BASE = format(int(time.time()), 'x')
+_NAME_COUNTER = itertools.count()
+
+
+def _non_text_fields(fields):
+    """
+    Resposta 400 (status, payload) se algum dos campos informados (valor não
+    None) não for texto; None se todos são strings ou ausentes. A mensagem
+    cita só os campos inválidos.
+    """
+    invalid = [name for name, value in fields.items() if value is not None and not isinstance(value, str)]
+    if not invalid:
+        return None
+    nomes = ' e '.join(f"'{name}'" for name in invalid)
+    if len(invalid) > 1:
+        message = f"Campos {nomes} devem ser texto"
+    else:
+        message = f"Campo {nomes} deve ser texto"
+    return 400, {"status": "erro", "message": message}
+
+
+def _default_filename(prefix, extension):
+    """Gera o nome de arquivo padrão quando o cliente não envia 'nome_arquivo'"""
+    return f'{prefix}_{_NAME_BASE}{next(_NAME_COUNTER):04x}{extension}'
+
+
+def _ensure_extension(nome_arquivo, extension):
+    """Garante a extensão no nome do arquivo (sem diferenciar maiúsculas: '.PDF' já vale)"""
+    if nome_arquivo[-len(extension):].lower() == extension:
+        return nome_arquivo
+    return nome_arquivo + extension
+
+
+# Timestamp das respostas com precisão de segundo: a string ISO é formatada uma
+# vez por segundo e reaproveitada (health checks em sequência não pagam o strftime)
+_TS_CACHE = (0, '')
+
+
+def _now_iso():
+    """Data/hora atual em ISO 8601, com precisão de segundo"""
+    global _TS_CACHE
+    now = int(time.time())
+    cached_second, cached_iso = _TS_CACHE
+    if now != cached_second:
+        cached_iso = datetime.fromtimestamp(now).isoformat()
+        _TS_CACHE = (now, cached_iso)
+    return cached_iso
+
+
+# Tamanho máximo do corpo das requisições POST (o Vercel aceita até 4,5 MB);
+# corpos maiores recebem 413 antes de serem lidos
+MAX_BODY_BYTES = int(os.environ.get('MAX_BODY_BYTES', 4718592))
+
+# Assinatura de arquivo ZIP local; todo DOCX começa com ela
+DOCX_MAGIC = b'PK\x03\x04'
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Blocos lidos por vez do corpo multipart/form-data
+MULTIPART_READ_SIZE = 64 * 1024
+
+# Blocos lidos por vez ao codificar em base64 (múltiplo de 3, sem padding no meio)
+B64_CHUNK_SIZE = 3 * 19456
+
+# Campos binários a partir deste tamanho têm os blocos codificados em paralelo
+# por threads (o pybase64 solta o GIL durante a codificação; o base64 da stdlib
+# não, então sem pybase64 ou com um único núcleo a codificação segue serial)
+PARALLEL_B64_MIN_BYTES = 512 * 1024
+B64_THREADS = min(os.cpu_count() or 1, 4)
+
+_B64_EXECUTOR = None
+_B64_EXECUTOR_LOCK = threading.Lock()
+
+
+def _is_binary(value):
+    """Campos binários da resposta: bytes, memoryview ou arquivo binário aberto"""
+    return isinstance(value, (bytes, bytearray, memoryview)) or hasattr(value, 'read')
+
+
+def _accept_quality(accept_ranges, media_type):
+    """
+    Qualidade (q) do Accept para media_type, tirada do intervalo mais
+    específico que o casa (tipo exato > tipo/* > */*); 0 se nenhum casa.
+    """
+    main_type = media_type.split('/', 1)[0] + '/*'
+    best = (-1, 0.0)
+    for media_range, quality in accept_ranges:
+        if media_range == media_type:
+            specificity = 2
+        elif media_range == main_type:
+            specificity = 1
+        elif media_range == '*/*':
+            specificity = 0
+        else:
+            continue
+        if specificity > best[0]:
+            best = (specificity, quality)
+    return best[1]
+
+
+def _prefers_pdf(accept):
+    """True só quando o header Accept prefere estritamente application/pdf a application/json"""
+    accept = accept.lower()
+    if 'application/pdf' not in accept:
+        return False
+    
+    accept_ranges = []
+    for entry in accept.split(','):
+        media_range, *params = entry.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accept_ranges.append((media_range.strip(), quality))
+    
+    return _accept_quality(accept_ranges, 'application/pdf') > _accept_quality(accept_ranges, 'application/json')
+
+
+def _binary_length(value):
+    """Tamanho em bytes de um campo binário (arquivos são medidos sem serem lidos)"""
+    if hasattr(value, 'read'):
+        length = value.seek(0, os.SEEK_END)
+        value.seek(0)
+        return length
+    return memoryview(value).nbytes
+
+
+def _iter_binary_blocks(value):
+    """Percorre um campo binário em blocos de B64_CHUNK_SIZE bytes"""
+    if hasattr(value, 'read'):
+        # Arquivos bufferizados devolvem o bloco completo até o fim do arquivo
+        yield from iter(lambda: value.read(B64_CHUNK_SIZE), b'')
+        return
+    data = memoryview(value).cast('B')
+    for start in range(0, len(data), B64_CHUNK_SIZE):
+        yield data[start:start + B64_CHUNK_SIZE]
+
+
+def _get_b64_executor():
+    """Devolve o pool de threads da codificação base64, criando-o sob lock no primeiro uso"""
+    global _B64_EXECUTOR
+    if _B64_EXECUTOR is None:
+        with _B64_EXECUTOR_LOCK:
+            if _B64_EXECUTOR is None:
+                _B64_EXECUTOR = ThreadPoolExecutor(max_workers=B64_THREADS, thread_name_prefix='b64')
+    return _B64_EXECUTOR
+
+
+def _iter_b64_blocks(value):
+    """
+    Codifica um campo binário em base64, bloco a bloco e na ordem. Campos grandes
+    mantêm até B64_THREADS blocos sendo codificados ao mesmo tempo, o que limita
+    a memória extra a poucos blocos.
+    """
+    blocks = _iter_binary_blocks(value)
+    if (not PYBASE64_AVAILABLE or B64_THREADS < 2
+            or _binary_length(value) < PARALLEL_B64_MIN_BYTES):
+        yield from map(_b64encode, blocks)
+        return
+    
+    executor = _get_b64_executor()
+    pending = deque()
+    for block in blocks:
+        pending.append(executor.submit(_b64encode, block))
+        if len(pending) >= B64_THREADS:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _encode_response(response):
+    """
+    Serializa a resposta em JSON (UTF-8); devolve (tamanho, blocos).
+    
+    Campos binários (bytes/memoryview ou arquivo aberto) são codificados em
+    base64 em blocos à medida que 'blocos' é percorrido, para que o chamador
+    escreva cada um direto no socket: nem a string base64 nem o corpo inteiro
+    chegam a existir na memória. Arquivos são lidos do início ao fim e fechados.
+    """
+    binary_fields = [key for key, value in response.items() if _is_binary(value)]
+    if not binary_fields:
+        body = _dumps(response)
+        return len(body), iter((body,))
+    
+    fields = {key: value for key, value in response.items() if key not in binary_fields}
+    head = _dumps(fields)[:-1]  # sem o '}' final, para anexar os campos binários
+    
+    # O tamanho exato do corpo vai no Content-Length antes do primeiro bloco
+    segments = []
+    size = len(head) + 1
+    for key in binary_fields:
+        key_prefix = (b',' if len(head) > 1 or segments else b'') + _dumps(key) + b':"'
+        segments.append((key_prefix, response[key]))
+        size += len(key_prefix) + (_binary_length(response[key]) + 2) // 3 * 4 + 1
+    
+    return size, _iter_response_body(head, segments)
+
+
+def _iter_response_body(head, segments):
+    """
+    Gera o corpo JSON em blocos: os pedaços pequenos (início do JSON, nomes dos
+    campos, aspas) são acumulados e saem junto com o próximo bloco base64, para
+    não gastar uma escrita no socket com poucos bytes.
+    """
+    pending = bytearray(head)
+    try:
+        for key_prefix, value in segments:
+            pending += key_prefix
+            for chunk in _iter_b64_blocks(value):
+                if pending:
+                    pending += chunk
+                    yield pending
+                    pending = bytearray()
+                else:
+                    yield chunk
+            pending += b'"'
+        pending += b'}'
+        yield pending
+    finally:
+        for _, value in segments:
+            if hasattr(value, 'close'):
+                value.close()
+
+
 # Adiciona o diretório pai ao path para importar o módulo
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 sys.path.insert(0, current_dir)
 
-try:
-    from markdown_to_pdf_reportlab import MarkdownToPDFReportLab
-    from markdown_to_docx import MarkdownToDocx
-    from json_to_excel import JsonToExcel
-    from docx_to_pdf import DocxToPdf
-except ImportError:
-    # Se não conseguir importar, cria placeholders
-    class MarkdownToPDFReportLab:
-        def __init__(self):
-            pass
-        def markdown_text_to_pdf(self, text, path):
-            return False
+# Dependências dos conversores: módulo importável -> pacote do requirements.txt.
+# São instaladas no build (o Vercel instala o requirements.txt no deploy); aqui
+# só se verifica, uma vez na carga do módulo, se estão presentes.
+CONVERTER_PACKAGES = {
+    'reportlab': 'reportlab==4.2.2',
+    'markdown2': 'markdown2==2.5.0',
+    'docx': 'python-docx==1.2.0',
+    'openpyxl': 'openpyxl==3.1.5',
+}
+
+
+# Módulos (chaves de CONVERTER_PACKAGES) de que cada conversão depende
+CONVERSION_MODULES = {
+    'pdf': ('reportlab', 'markdown2'),
+    'docx': ('docx', 'markdown2'),
+    'excel': ('openpyxl',),
+    'docx_pdf': ('docx', 'reportlab'),
+}
+
+
+def _missing_packages():
+    """Pacotes dos conversores que não estão instalados, por módulo (find_spec não importa nada)"""
+    return {
+        module: package for module, package in CONVERTER_PACKAGES.items()
+        if importlib.util.find_spec(module) is None
+    }
+
+
+_MISSING_PACKAGES = _missing_packages()
+
+# Pacotes ausentes por conversão: só as rotas que dependem deles respondem 503
+_CONVERSION_MISSING = {
+    conversion: [_MISSING_PACKAGES[module] for module in modules if module in _MISSING_PACKAGES]
+    for conversion, modules in CONVERSION_MODULES.items()
+}
+
+if _MISSING_PACKAGES:
+    # Sem nova tentativa por requisição: as rotas afetadas respondem 503
+    logger.error(f"Dependências dos conversores indisponíveis ({', '.join(_MISSING_PACKAGES.values())}); "
+                  "rotas que dependem delas responderão 503")
+
+
+def _dependencies_unavailable(conversion, label):
+    """
+    Resposta 503 (status, payload) se faltar algum pacote da conversão,
+    citando os pacotes realmente ausentes; None se ela pode rodar.
+    """
+    missing = _CONVERSION_MISSING[conversion]
+    if not missing:
+        return None
+    return 503, {
+        "status": "erro",
+        "message": f"Dependências para {label} não instaladas ({', '.join(missing)})"
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _converter_class(module_name, class_name):
+    """
+    Importa a classe do conversor no primeiro uso. reportlab, lxml e openpyxl
+    só são carregados quando a rota correspondente é chamada, então o
+    cold start do GET /verificar não paga por eles.
+    """
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# Conversores compartilhados, criados no primeiro uso: MarkdownToPDFReportLab
+# monta os estilos do ReportLab uma vez e DocxToPdf procura o soffice no PATH
+# uma vez; nenhum dos dois guarda estado por chamada
+_PDF_CONVERTER = None
+_DOCX_TO_PDF_CONVERTER = None
+_SHARED_CONVERTERS_LOCK = threading.Lock()
+
+
+def _get_pdf_converter():
+    """Devolve a instância única de MarkdownToPDFReportLab, criando-a sob lock se necessário"""
+    global _PDF_CONVERTER
+    if _PDF_CONVERTER is None:
+        with _SHARED_CONVERTERS_LOCK:
+            if _PDF_CONVERTER is None:
+                _PDF_CONVERTER = _converter_class('markdown_to_pdf_reportlab', 'MarkdownToPDFReportLab')()
+    return _PDF_CONVERTER
+
+
+def _get_docx_to_pdf_converter():
+    """Devolve a instância única de DocxToPdf, criando-a sob lock se necessário"""
+    global _DOCX_TO_PDF_CONVERTER
+    if _DOCX_TO_PDF_CONVERTER is None:
+        with _SHARED_CONVERTERS_LOCK:
+            if _DOCX_TO_PDF_CONVERTER is None:
+                _DOCX_TO_PDF_CONVERTER = _converter_class('docx_to_pdf', 'DocxToPdf')()
+    return _DOCX_TO_PDF_CONVERTER
+
+
+def _convert_markdown_to_pdf_bytes(texto_markdown):
+    """Converte Markdown em PDF na memória; devolve os bytes (memoryview) ou None se falhar"""
+    pdf_buffer = io.BytesIO()
+    if not _get_pdf_converter().markdown_text_to_pdf(texto_markdown, pdf_buffer):
+        return None
+    return pdf_buffer.getbuffer()
+
+
+def _convert_markdown_to_docx_bytes(texto_markdown):
+    """Converte Markdown em Word na memória; devolve os bytes ou None se falhar"""
+    converter = _converter_class('markdown_to_docx', 'MarkdownToDocx')()
+    return converter.markdown_text_to_docx_bytes(texto_markdown)
+
+
+def _convert_json_to_excel_bytes(dados_json, nome_aba, aplicar_formatacao):
+    """Converte JSON em Excel na memória; devolve os bytes (memoryview) ou None se falhar"""
+    excel_buffer = io.BytesIO()
+    converter = _converter_class('json_to_excel', 'JsonToExcel')()
+    if not converter.json_to_excel_file(dados_json, excel_buffer, nome_aba, aplicar_formatacao):
+        return None
+    return excel_buffer.getbuffer()
+
+
+def _convert_docx_to_pdf_stream(arquivo_content):
+    """
+    Converte DOCX para PDF num SpooledTemporaryFile: fica em memória e, se passar
+    do limite, vai para um arquivo anônimo (O_TMPFILE no Linux), sem entrada de
+    diretório nem unlink. Devolve None se falhar.
+    """
+    return _get_docx_to_pdf_converter().convert_docx_content_to_stream(arquivo_content)
+
+
+# Pool de processos opcional para as conversões (CONVERSION_WORKERS > 0): dá
+# paralelismo real entre núcleos no servidor local com threads. No Vercel cada
+# instância atende uma requisição por vez, então o padrão (0) converte na
+# própria thread, sem o custo de subir processos nem de serializar os dados.
+CONVERSION_WORKERS = int(os.environ.get('CONVERSION_WORKERS', '0'))
+CONVERSION_TIMEOUT = float(os.environ.get('CONVERSION_TIMEOUT', '30'))
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool():
+    """Devolve o pool de processos, criando-o sob lock no primeiro uso"""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                # spawn: o servidor tem threads, e fork com threads ativas não é seguro
+                _POOL = ProcessPoolExecutor(
+                    max_workers=CONVERSION_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_worker
+                )
+    return _POOL
+
+
+def _warm_worker():
+    """
+    Inicializa o processo do pool: importa o ReportLab e monta o conversor de
+    PDF antes da primeira conversão. O processo vive enquanto o pool existir,
+    então esse custo é pago uma vez por worker e não por requisição.
+    """
+    if _CONVERSION_MISSING['pdf']:
+        return
+    try:
+        _get_pdf_converter().markdown_text_to_pdf("# warmup", io.BytesIO())
+    except Exception as e:
+        logger.warning(f"Falha ao aquecer o worker de conversão: {e!r}")
+
+
+def _reset_pool(broken_pool, terminate=False):
+    """
+    Descarta o pool quebrado (worker morto) ou travado; o próximo uso cria um
+    novo. Com terminate=True os workers são encerrados, liberando o processo
+    preso numa conversão que estourou o timeout.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is broken_pool:
+            _POOL = None
+    if terminate:
+        if hasattr(broken_pool, 'terminate_workers'):
+            # Python 3.14+
+            broken_pool.terminate_workers()
+            return
+        for process in list((getattr(broken_pool, '_processes', None) or {}).values()):
+            process.terminate()
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_in_worker(convert, *args):
+    """Roda a conversão no processo do pool; memoryview e streams viram bytes para o pickle"""
+    result = convert(*args)
+    if result is None or isinstance(result, bytes):
+        return result
+    if hasattr(result, 'read'):
+        with result:
+            return result.read()
+    return bytes(result)
+
+
+def _run_conversion(convert, *args):
+    """
+    Executa convert(*args) no pool de processos, se configurado, ou na própria
+    thread. Devolve None se a conversão estourar o timeout ou o worker morrer.
+    """
+    if CONVERSION_WORKERS <= 0:
+        return convert(*args)
     
-    class MarkdownToDocx:
-        def __init__(self):
-            pass
-        def markdown_text_to_docx(self, text, path):
-            return False
+    future = None
+    for _ in range(2):
+        pool = _get_pool()
+        try:
+            future = pool.submit(_call_in_worker, convert, *args)
+            break
+        except RuntimeError:
+            # Pool encerrado por outra thread (timeout) ou já quebrado entre o
+            # _get_pool e o submit: a conversão não chegou a rodar, então vai
+            # uma vez para o pool novo
+            _reset_pool(pool)
+    if future is None:
+        logger.error(f"Pool de conversão indisponível: {convert.__name__}")
+        return None
     
-    class JsonToExcel:
-        def __init__(self):
-            pass
-        def json_to_excel_file(self, data, path, sheet_name, apply_formatting):
-            return False
-        def validate_json_data(self, data):
-            return False, "Classe não funcional"
+    try:
+        return future.result(timeout=CONVERSION_TIMEOUT)
+    except FutureTimeoutError:
+        logger.error(f"Conversão excedeu {CONVERSION_TIMEOUT}s: {convert.__name__}")
+        if not future.cancel():
+            # Já em execução: cancel() não para o worker, que seguiria ocupando
+            # uma vaga do pool. O pool é encerrado e recriado no próximo uso
+            # (conversões em andamento nele também falham)
+            _reset_pool(pool, terminate=True)
+        return None
+    except BrokenProcessPool:
+        # Um worker morreu (falta de memória, sinal, pool encerrado por timeout).
+        # A conversão não é repetida aqui: se foi ela que derrubou o worker,
+        # faria o mesmo com o processo do servidor. O pool é recriado na
+        # próxima requisição
+        logger.error(f"Pool de conversão quebrado: {convert.__name__}")
+        _reset_pool(pool)
+        return None
+
+
+# Cache LRU dos PDFs gerados, chaveado pelo hash do Markdown: reenvios do mesmo
+# texto (pré-visualização no editor, CI) não passam de novo pelo ReportLab.
+# PDF_CACHE_SIZE=0 desliga o cache.
+PDF_CACHE_SIZE = int(os.environ.get('PDF_CACHE_SIZE', '32'))
+
+_PDF_CACHE = OrderedDict()
+_PDF_CACHE_LOCK = threading.Lock()
+
+
+def _markdown_digest(texto_markdown):
+    """Hash de 128 bits do texto Markdown (xxh128 se disponível, senão blake2b)"""
+    data = texto_markdown.encode('utf-8', 'surrogatepass')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _markdown_to_pdf_cached(texto_markdown):
+    """Converte Markdown em PDF consultando antes o cache; devolve os bytes ou None"""
+    if PDF_CACHE_SIZE <= 0:
+        return _run_conversion(_convert_markdown_to_pdf_bytes, texto_markdown)
     
-    class DocxToPdf:
-        def __init__(self):
-            pass
-        def convert_docx_content_to_pdf(self, content, path):
-            return False
+    key = _markdown_digest(texto_markdown)
+    with _PDF_CACHE_LOCK:
+        pdf_content = _PDF_CACHE.get(key)
+        if pdf_content is not None:
+            _PDF_CACHE.move_to_end(key)
+            return pdf_content
+    
+    pdf_content = _run_conversion(_convert_markdown_to_pdf_bytes, texto_markdown)
+    if pdf_content is None:
+        return None
+    if isinstance(pdf_content, memoryview):
+        # Somente leitura: a mesma view é entregue a várias respostas
+        pdf_content = pdf_content.toreadonly()
+    
+    with _PDF_CACHE_LOCK:
+        _PDF_CACHE[key] = pdf_content
+        _PDF_CACHE.move_to_end(key)
+        while len(_PDF_CACHE) > PDF_CACHE_SIZE:
+            _PDF_CACHE.popitem(last=False)
+    return pdf_content
+
+
+def _split_body(response, field):
+    """Serializa a resposta e a divide em (prefixo, sufixo) em volta do valor de 'field'"""
+    marker = _dumps('\x00')
+    prefix, suffix = _dumps({**response, field: '\x00'}).split(marker)
+    return prefix, suffix
+
+
+# Rotas públicas (método, path, descrição): fonte única das listas do GET e dos 404
+_STATIC_ROTAS = (
+    ("GET", "/", "Status da API"),
+    ("GET", "/verificar", "Verificação de saúde"),
+    ("POST", "/converter-markdown-pdf-base64", "Converter Markdown para PDF"),
+    ("POST", "/converter-markdown-docx-base64", "Converter Markdown para Word"),
+    ("POST", "/converter-json-excel-base64", "Converter JSON para Excel"),
+    ("POST", "/converter-docx-pdf-base64", "Converter DOCX/DOC para PDF"),
+    ("POST", "/converter-markdown-pdf", "Download do PDF (binário)"),
+    ("POST", "/converter-markdown-docx", "Download do Word (binário)"),
+    ("POST", "/converter-json-excel", "Download do Excel (binário)"),
+    ("POST", "/converter-docx-pdf", "Download do PDF a partir de DOCX (binário)"),
+)
+_POST_ROTAS = [path for method, path, _ in _STATIC_ROTAS if method == "POST"]
+
+# Respostas do GET montadas uma única vez na importação
+_HEALTH_BODIES = {
+    path: _split_body({
+        "status": "ok",
+        "message": "API Markdown para PDF, Word e Excel funcionando no Vercel!",
+        "timestamp": None,
+        "path": path,
+        "method": "GET",
+        "rotas_disponiveis": [
+            f"{method} {rota} - {descricao}" for method, rota, descricao in _STATIC_ROTAS
+        ]
+    }, "timestamp")
+    for path in ('/', '/verificar')
+}
+
+_NOT_FOUND_PREFIX, _NOT_FOUND_SUFFIX = _split_body({
+    "status": "erro",
+    "message": None,
+    "rotas_disponiveis": [path for _, path, _ in _STATIC_ROTAS]
+}, "message")
+
+# Headers CORS idênticos em todas as rotas, já em bytes
+_CORS_HEADER_BYTES = (
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n'
+    b'Access-Control-Allow-Headers: Content-Type\r\n'
+)
+_JSON_HEADER_BYTES = b'Content-type: application/json\r\n' + _CORS_HEADER_BYTES
+
+# Corpos até este tamanho vão no mesmo write dos headers; acima disso, copiar
+# o corpo para junto dos headers custa mais que um segundo write
+SINGLE_WRITE_MAX_BODY = 64 * 1024
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -62,49 +690,18 @@ class handler(BaseHTTPRequestHandler):
         parsed_path = urllib.parse.urlparse(self.path)
         path = parsed_path.path
         
-        # Headers de resposta
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        
-        # Rota de verificação
-        if path in ['/', '/verificar']:
-            response = {
-                "status": "ok",
-                "message": "API Markdown para PDF, Word e Excel funcionando no Vercel!",
-                "timestamp": datetime.now().isoformat(),
-                "path": path,
-                "method": "GET",
-                "rotas_disponiveis": [
-                    "GET / - Status da API",
-                    "GET /verificar - Verificação de saúde",
-                    "POST /converter-markdown-pdf-base64 - Converter Markdown para PDF",
-                    "POST /converter-markdown-docx-base64 - Converter Markdown para Word",
-                    "POST /converter-json-excel-base64 - Converter JSON para Excel",
-                    "POST /converter-docx-pdf-base64 - Converter DOCX/DOC para PDF"
-                ]
-            }
+        # Corpos pré-serializados: só o timestamp (ou o path, no 404) muda por requisição
+        health_body = _HEALTH_BODIES.get(path)
+        if health_body is not None:
+            prefix, suffix = health_body
+            status_code = 200
+            body = prefix + _dumps(_now_iso()) + suffix
         else:
             # Rota não encontrada
-            self.send_response(404)
-            response = {
-                "status": "erro",
-                "message": f"Rota não encontrada: {path}",
-                "rotas_disponiveis": [
-                    "/", 
-                    "/verificar", 
-                    "/converter-markdown-pdf-base64",
-                    "/converter-markdown-docx-base64",
-                    "/converter-json-excel-base64",
-                    "/converter-docx-pdf-base64"
-                ]
-            }
+            status_code = 404
+            body = _NOT_FOUND_PREFIX + _dumps(f"Rota não encontrada: {path}") + _NOT_FOUND_SUFFIX
         
-        # Envia resposta
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+        self._write_response(status_code, _JSON_HEADER_BYTES, body)
     
     def do_POST(self):
         """Handle POST requests"""
@@ -114,89 +711,198 @@ class handler(BaseHTTPRequestHandler):
         path = parsed_path.path
         
         try:
-            # Verifica o tipo de conteúdo
-            content_type = self.headers.get('Content-Type', '')
-            
-            if 'multipart/form-data' in content_type:
-                # Processa multipart/form-data
-                if CGI_AVAILABLE:
-                    form = cgi.FieldStorage(
-                        fp=self.rfile,
-                        headers=self.headers,
-                        environ={'REQUEST_METHOD': 'POST'}
-                    )
-                    data = self._parse_multipart_data(form)
-                else:
-                    # Fallback: processa como raw data 
-                    data = self._parse_multipart_raw(content_type)
-            else:
-                # Processa JSON
-                content_length = int(self.headers['Content-Length']) if 'Content-Length' in self.headers else 0
-                if content_length > 0:
-                    post_data = self.rfile.read(content_length)
-                    data = json.loads(post_data.decode('utf-8'))
-                else:
-                    data = {}
-            
-            # Rotas de conversão
-            if path == '/converter-markdown-pdf-base64':
-                response = self.handle_pdf_conversion(data)
-                status_code = response.get('status_code', 200)
-            elif path == '/converter-markdown-docx-base64':
-                response = self.handle_docx_conversion(data)
-                status_code = response.get('status_code', 200)
-            elif path == '/converter-json-excel-base64':
-                response = self.handle_excel_conversion(data)
-                status_code = response.get('status_code', 200)
-            elif path == '/converter-docx-pdf-base64':
-                response = self.handle_docx_to_pdf_conversion(data)
-                status_code = response.get('status_code', 200)
-            else:
-                response = {
+            # Rotas de conversão: busca direta na tabela, sem cadeia de if/elif
+            route = self.POST_ROUTES.get(path)
+            download = None
+            if route is None:
+                download = self.DOWNLOAD_ROUTES.get(path)
+                if download is not None:
+                    route = download[0]
+            
+            if route is None:
+                status_code, response = 404, {
                     "status": "erro",
                     "message": f"Rota POST não encontrada: {path}",
-                    "rotas_disponiveis": [
-                        "/converter-markdown-pdf-base64",
-                        "/converter-markdown-docx-base64",
-                        "/converter-json-excel-base64",
-                        "/converter-docx-pdf-base64"
-                    ]
+                    "rotas_disponiveis": _POST_ROTAS
+                }
+            elif self._content_length() > MAX_BODY_BYTES:
+                status_code, response = 413, {
+                    "status": "erro",
+                    "message": f"Corpo da requisição excede o limite de {MAX_BODY_BYTES} bytes"
                 }
-                status_code = 404
+            else:
+                try:
+                    data = self._read_request_data()
+                except ValueError as e:
+                    status_code, response = 400, {
+                        "status": "erro",
+                        "message": f"Corpo da requisição inválido: {str(e)}"
+                    }
+                else:
+                    # Os handlers devolvem (status_code, payload)
+                    status_code, response = route(self, data)
             
-            # Envia resposta
-            self.send_response(status_code)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
+            # Rotas de download e clientes que preferem application/pdf a
+            # application/json no Accept recebem o arquivo binário, sem base64 nem JSON
+            if status_code == 200:
+                if download is not None:
+                    _, field, content_type = download
+                elif (_is_binary(response.get('pdf_base64'))
+                        and _prefers_pdf(self.headers.get('Accept', ''))):
+                    field, content_type = 'pdf_base64', 'application/pdf'
+                else:
+                    field = None
+                if field is not None:
+                    self._send_file(response[field], response['nome_arquivo'], content_type)
+                    return
             
-            # Remove status_code da resposta antes de enviar
-            if 'status_code' in response:
-                del response['status_code']
+            # Envia resposta: o primeiro bloco é gerado antes dos headers (erros
+            # ainda viram 500) e os demais vão direto para o socket
+            content_length, chunks = _encode_response(response)
+            self._write_response(status_code, _JSON_HEADER_BYTES, next(chunks), content_length)
+            try:
+                for chunk in chunks:
+                    self.wfile.write(chunk)
+            except Exception as e:
+                # Headers já enviados: não há como responder 500, só encerrar a conexão
+                logger.warning(f"Erro ao enviar a resposta: {e!r}")
+                self.close_connection = True
             
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
             
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
             error_response = {
                 "status": "erro",
                 "message": f"Erro no servidor: {str(e)}"
             }
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+            self._write_response(500, _JSON_HEADER_BYTES, _dumps(error_response))
+    
+    def _write_response(self, status_code, headers, body=b'', content_length=None):
+        """
+        Escreve status, headers e corpo direto no wfile, sem send_header por linha.
+        
+        'headers' são linhas já em bytes terminadas em CRLF. Corpos pequenos saem
+        no mesmo write dos headers; 'body' pode ser None quando o chamador escreve
+        o corpo em seguida (informando content_length).
+        """
+        self.log_request(status_code)
+        if content_length is None:
+            content_length = len(body)
+        phrase = self.responses[status_code][0] if status_code in self.responses else ''
+        head = bytearray(
+            f"{self.protocol_version} {status_code} {phrase}\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+            f"Content-Length: {content_length}\r\n".encode('latin-1', 'strict')
+        )
+        head += headers
+        head += b'\r\n'
+        if body is not None and len(body) <= SINGLE_WRITE_MAX_BODY:
+            head += body
+            self.wfile.write(head)
+        else:
+            self.wfile.write(head)
+            if body is not None:
+                self.wfile.write(body)
+    
+    def _send_file(self, file_content, nome_arquivo, content_type):
+        """Envia o arquivo binário como anexo"""
+        headers = (
+            b'Content-type: ' + content_type.encode('ascii') + b'\r\n'
+            b"Content-Disposition: attachment; filename*=UTF-8''"
+            + urllib.parse.quote(nome_arquivo).encode('ascii') + b'\r\n'
+            + _CORS_HEADER_BYTES
+            + b'Access-Control-Expose-Headers: Content-Disposition\r\n'
+        )
+        if hasattr(file_content, 'read'):
+            self._write_response(200, headers, None, _binary_length(file_content))
+            with file_content:
+                shutil.copyfileobj(file_content, self.wfile)
+        else:
+            self._write_response(200, headers, file_content)
     
     def do_OPTIONS(self):
         """Handle OPTIONS requests for CORS"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self._write_response(200, _CORS_HEADER_BYTES)
+    
+    def _content_length(self):
+        """Retorna o Content-Length da requisição (0 se ausente ou inválido)"""
+        try:
+            return int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            return 0
+    
+    def _read_request_data(self):
+        """Lê o corpo da requisição (JSON ou multipart/form-data) e devolve um dict"""
+        content_type = self.headers.get('Content-Type', '')
+        
+        if 'multipart/form-data' in content_type:
+            # Processa multipart/form-data
+            if STREAMING_FORM_DATA_AVAILABLE:
+                return self._parse_multipart_stream()
+            if CGI_AVAILABLE:
+                form = cgi.FieldStorage(
+                    fp=self.rfile,
+                    headers=self.headers,
+                    environ={'REQUEST_METHOD': 'POST'}
+                )
+                return self._parse_multipart_data(form)
+            # Fallback: processa como raw data
+            return self._parse_multipart_raw(content_type)
+        
+        # Processa JSON (orjson e json aceitam bytearray UTF-8 diretamente)
+        content_length = self._content_length()
+        if content_length > 0:
+            return _loads(self._read_body(content_length))
+        return {}
+    
+    def _read_body(self, content_length):
+        """Lê o corpo num bytearray pré-alocado com readinto, sem cópias intermediárias"""
+        body = bytearray(content_length)
+        with memoryview(body) as view:
+            received = 0
+            while received < content_length:
+                n = self.rfile.readinto(view[received:])
+                if not n:
+                    break
+                received += n
+        # Corpo truncado: devolve só o que chegou (o parse acusa o erro)
+        del body[received:]
+        return body
+    
+    def _parse_multipart_stream(self):
+        """Parse multipart/form-data com streaming-form-data, lendo o corpo em blocos"""
+        try:
+            parser = StreamingFormDataParser(headers=self.headers)
+        except ParseFailedException as e:
+            raise ValueError(f"multipart/form-data: {e}")
+        
+        # Um target para todos os campos: como no cgi.FieldStorage, qualquer
+        # parte com filename é o arquivo e as demais são campos de texto
+        partes = _FormPartsTarget()
+        parser.register('', partes, matches=partes.match_any)
+        
+        remaining = self._content_length()
+        try:
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, MULTIPART_READ_SIZE))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                parser.data_received(chunk)
+        except ParseFailedException as e:
+            raise ValueError(f"multipart/form-data: {e}")
+        
+        data = {}
+        for name, filename, content in partes.parts:
+            if filename is not None:
+                # Bytes crus: o handler usa direto, sem codificar e decodificar base64
+                data['_arquivo_raw'] = content
+                if filename:
+                    data['nome_arquivo_original'] = filename
+            else:
+                data[name] = content.decode('utf-8', errors='replace')
+        
+        return data
     
     def _parse_multipart_data(self, form):
         """Parse multipart/form-data"""
@@ -205,12 +911,14 @@ class handler(BaseHTTPRequestHandler):
         for field_name in form.keys():
             field = form[field_name]
             
-            if hasattr(field, 'file') and field.file:
+            # Partes com filename são arquivos (o cgi também expõe .file nos
+            # campos de texto, então ele não serve para distinguir)
+            if getattr(field, 'filename', None) is not None:
                 # É um arquivo
                 file_content = field.file.read()
                 if isinstance(file_content, bytes):
-                    # Converte arquivo para base64 
-                    data['arquivo_base64'] = base64.b64encode(file_content).decode('utf-8')
+                    # Bytes crus: o handler usa direto, sem codificar e decodificar base64
+                    data['_arquivo_raw'] = file_content
                     if hasattr(field, 'filename') and field.filename:
                         data['nome_arquivo_original'] = field.filename
             else:
@@ -238,7 +946,7 @@ class handler(BaseHTTPRequestHandler):
                 return data
             
             # Lê todo o conteúdo
-            content_length = int(self.headers.get('Content-Length', 0))
+            content_length = self._content_length()
             if content_length == 0:
                 return data
                 
@@ -279,8 +987,8 @@ class handler(BaseHTTPRequestHandler):
                 
                 if field_name:
                     if is_file:
-                        # Converte arquivo para base64
-                        data['arquivo_base64'] = base64.b64encode(content_section).decode('utf-8')
+                        # Bytes crus: o handler usa direto, sem codificar e decodificar base64
+                        data['_arquivo_raw'] = content_section
                     else:
                         # Campo de texto
                         data[field_name] = content_section.decode('utf-8', errors='ignore').strip()
@@ -291,433 +999,323 @@ class handler(BaseHTTPRequestHandler):
             
         return data
     
-    def install_dependencies(self, packages):
-        """Tenta instalar dependências necessárias"""
-        try:
-            import subprocess
-            subprocess.check_call([
-                sys.executable, '-m', 'pip', 'install'
-            ] + packages, timeout=90)
-            return True
-        except Exception as e:
-            return False
-    
     def handle_pdf_conversion(self, data):
         """Handle markdown to PDF conversion"""
         try:
-            # Tenta garantir que as dependências estão instaladas
-            global MarkdownToPDFReportLab
-            try:
-                # Testa se a classe funciona
-                test_converter = MarkdownToPDFReportLab()
-                if not hasattr(test_converter, 'markdown_text_to_pdf'):
-                    raise ImportError("Classe não funcional")
-            except:
-                # Tenta instalar dependências
-                if self.install_dependencies(['reportlab==4.4.6', 'markdown2==2.5.4']):
-                    try:
-                        from markdown_to_pdf_reportlab import MarkdownToPDFReportLab
-                    except ImportError as e:
-                        return {
-                            "status": "erro",
-                            "message": f"Erro ao importar após instalação: {str(e)}",
-                            "status_code": 500
-                        }
-                else:
-                    return {
-                        "status": "erro",
-                        "message": "Não foi possível instalar as dependências para PDF",
-                        "status_code": 500
-                    }
+            # Dependências resolvidas uma única vez na carga do módulo
+            unavailable = _dependencies_unavailable('pdf', 'PDF')
+            if unavailable is not None:
+                return unavailable
             
             # Validação
             if not data or 'texto_markdown' not in data or not data['texto_markdown']:
-                return {
+                return 400, {
                     "status": "erro",
-                    "message": "Campo 'texto_markdown' é obrigatório e não pode estar vazio",
-                    "status_code": 400
+                    "message": "Campo 'texto_markdown' é obrigatório e não pode estar vazio"
                 }
             
             texto_markdown = data['texto_markdown']
-            nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.pdf')
+            nome_arquivo = data.get('nome_arquivo')
             
-            if not nome_arquivo.endswith('.pdf'):
-                nome_arquivo += '.pdf'
+            invalid = _non_text_fields({'texto_markdown': texto_markdown, 'nome_arquivo': nome_arquivo})
+            if invalid is not None:
+                return invalid
             
-            # Arquivo temporário
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_path = temp_file.name
+            # O nome padrão já sai com a extensão; só o nome do cliente é conferido
+            if nome_arquivo is None:
+                nome_arquivo = _default_filename('documento', '.pdf')
+            else:
+                nome_arquivo = _ensure_extension(nome_arquivo, '.pdf')
             
-            # Converte
-            converter = MarkdownToPDFReportLab()
-            sucesso = converter.markdown_text_to_pdf(texto_markdown, temp_path)
+            # Gera o PDF em memória; os bytes vão crus e o base64 (quando houver)
+            # é gerado ao montar o corpo da resposta
+            pdf_content = _markdown_to_pdf_cached(texto_markdown)
             
-            if not sucesso:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return {
+            if pdf_content is None:
+                return 500, {
                     "status": "erro",
-                    "message": "Falha na conversão do Markdown para PDF",
-                    "status_code": 500
+                    "message": "Falha na conversão do Markdown para PDF"
                 }
             
-            # Lê e converte para base64
-            with open(temp_path, 'rb') as pdf_file:
-                pdf_content = pdf_file.read()
-                pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-            
-            os.unlink(temp_path)
-            
-            return {
+            return 200, {
                 "status": "sucesso",
                 "nome_arquivo": nome_arquivo,
-                "pdf_base64": pdf_base64,
+                "pdf_base64": pdf_content,
                 "tamanho": len(pdf_content),
-                "timestamp": datetime.now().isoformat(),
-                "status_code": 200
+                "timestamp": _now_iso()
             }
             
+        except OSError as e:
+            return 500, {
+                "status": "erro",
+                "message": f"Erro de E/S na conversão PDF: {str(e)}"
+            }
         except Exception as e:
-            # Limpa arquivo temporário se houver erro
-            try:
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except:
-                pass
-            
-            return {
+            logger.exception(f"Erro inesperado na conversão PDF: {e!r}")
+            return 500, {
                 "status": "erro",
-                "message": f"Erro na conversão PDF: {str(e)}",
-                "status_code": 500
+                "message": f"Erro na conversão PDF: {str(e)}"
             }
     
     def handle_docx_conversion(self, data):
         """Handle markdown to Word conversion"""
         try:
-            # Tenta garantir que as dependências estão instaladas
-            global MarkdownToDocx
-            try:
-                # Testa se a classe funciona
-                test_converter = MarkdownToDocx()
-                if not hasattr(test_converter, 'markdown_text_to_docx'):
-                    raise ImportError("Classe não funcional")
-            except:
-                # Tenta instalar dependências
-                if self.install_dependencies(['python-docx==1.1.2', 'markdown2==2.5.4']):
-                    try:
-                        from markdown_to_docx import MarkdownToDocx
-                    except ImportError as e:
-                        return {
-                            "status": "erro",
-                            "message": f"Erro ao importar após instalação: {str(e)}",
-                            "status_code": 500
-                        }
-                else:
-                    return {
-                        "status": "erro",
-                        "message": "Não foi possível instalar as dependências para Word",
-                        "status_code": 500
-                    }
+            # Dependências resolvidas uma única vez na carga do módulo
+            unavailable = _dependencies_unavailable('docx', 'Word')
+            if unavailable is not None:
+                return unavailable
             
             # Validação
             if not data or 'texto_markdown' not in data or not data['texto_markdown']:
-                return {
+                return 400, {
                     "status": "erro",
-                    "message": "Campo 'texto_markdown' é obrigatório e não pode estar vazio",
-                    "status_code": 400
+                    "message": "Campo 'texto_markdown' é obrigatório e não pode estar vazio"
                 }
             
             texto_markdown = data['texto_markdown']
-            nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.docx')
+            nome_arquivo = data.get('nome_arquivo')
             
-            if not nome_arquivo.endswith('.docx'):
-                nome_arquivo += '.docx'
+            invalid = _non_text_fields({'texto_markdown': texto_markdown, 'nome_arquivo': nome_arquivo})
+            if invalid is not None:
+                return invalid
             
-            # Arquivo temporário
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-                temp_path = temp_file.name
+            # O nome padrão já sai com a extensão; só o nome do cliente é conferido
+            if nome_arquivo is None:
+                nome_arquivo = _default_filename('documento', '.docx')
+            else:
+                nome_arquivo = _ensure_extension(nome_arquivo, '.docx')
             
-            # Converte
-            converter = MarkdownToDocx()
-            sucesso = converter.markdown_text_to_docx(texto_markdown, temp_path)
+            # Gera o documento em memória; os bytes vão crus e o base64 (quando
+            # houver) é gerado ao montar o corpo da resposta
+            docx_content = _run_conversion(_convert_markdown_to_docx_bytes, texto_markdown)
             
-            if not sucesso:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return {
+            if docx_content is None:
+                return 500, {
                     "status": "erro",
-                    "message": "Falha na conversão do Markdown para Word",
-                    "status_code": 500
+                    "message": "Falha na conversão do Markdown para Word"
                 }
             
-            # Lê e converte para base64
-            with open(temp_path, 'rb') as docx_file:
-                docx_content = docx_file.read()
-                docx_base64 = base64.b64encode(docx_content).decode('utf-8')
-            
-            os.unlink(temp_path)
-            
-            return {
+            return 200, {
                 "status": "sucesso",
                 "nome_arquivo": nome_arquivo,
-                "docx_base64": docx_base64,
+                "docx_base64": docx_content,
                 "tamanho": len(docx_content),
-                "timestamp": datetime.now().isoformat(),
-                "status_code": 200
+                "timestamp": _now_iso()
             }
             
         except Exception as e:
-            # Limpa arquivo temporário se houver erro
-            try:
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except:
-                pass
-            
-            return {
+            return 500, {
                 "status": "erro",
-                "message": f"Erro na conversão Word: {str(e)}",
-                "status_code": 500
+                "message": f"Erro na conversão Word: {str(e)}"
             }
     
     def handle_excel_conversion(self, data):
         """Handle JSON to Excel conversion"""
         try:
-            # Tenta garantir que as dependências estão instaladas
-            global JsonToExcel
-            try:
-                # Testa se a classe funciona
-                test_converter = JsonToExcel()
-                if not hasattr(test_converter, 'json_to_excel_file'):
-                    raise ImportError("Classe não funcional")
-            except:
-                # Tenta instalar dependências
-                if self.install_dependencies(['pandas==2.2.0', 'openpyxl==3.1.5']):
-                    try:
-                        from json_to_excel import JsonToExcel
-                    except ImportError as e:
-                        return {
-                            "status": "erro",
-                            "message": f"Erro ao importar após instalação: {str(e)}",
-                            "status_code": 500
-                        }
-                else:
-                    return {
-                        "status": "erro",
-                        "message": "Não foi possível instalar as dependências para Excel",
-                        "status_code": 500
-                    }
+            # Dependências resolvidas uma única vez na carga do módulo
+            unavailable = _dependencies_unavailable('excel', 'Excel')
+            if unavailable is not None:
+                return unavailable
             
             # Validação
             if not data or 'dados_json' not in data or not data['dados_json']:
-                return {
+                return 400, {
                     "status": "erro",
-                    "message": "Campo 'dados_json' é obrigatório e não pode estar vazio",
-                    "status_code": 400
+                    "message": "Campo 'dados_json' é obrigatório e não pode estar vazio"
                 }
             
             dados_json = data['dados_json']
-            nome_arquivo = data.get('nome_arquivo', f'planilha_{uuid.uuid4().hex[:8]}.xlsx')
-            nome_aba = data.get('nome_aba', 'Dados')
-            aplicar_formatacao = data.get('aplicar_formatacao', True)
+            nome_arquivo = data.get('nome_arquivo')
+            nome_aba = data.get('nome_aba')
             
-            if not nome_arquivo.endswith('.xlsx'):
-                nome_arquivo += '.xlsx'
+            invalid = _non_text_fields({'nome_arquivo': nome_arquivo, 'nome_aba': nome_aba})
+            if invalid is not None:
+                return invalid
             
-            # Arquivo temporário
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
-                temp_path = temp_file.name
+            # "nome_aba": null equivale a não enviar o campo
+            if nome_aba is None:
+                nome_aba = 'Dados'
             
-            # Converte JSON para Excel
-            converter = JsonToExcel()
+            # O nome padrão já sai com a extensão; só o nome do cliente é conferido
+            if nome_arquivo is None:
+                nome_arquivo = _default_filename('planilha', '.xlsx')
+            else:
+                nome_arquivo = _ensure_extension(nome_arquivo, '.xlsx')
+            aplicar_formatacao = data.get('aplicar_formatacao', True)
             
             # Valida os dados primeiro
+            converter = _converter_class('json_to_excel', 'JsonToExcel')()
             is_valid, error_msg = converter.validate_json_data(dados_json)
             if not is_valid:
-                return {
+                return 400, {
                     "status": "erro",
-                    "message": f"Dados JSON inválidos: {error_msg}",
-                    "status_code": 400
+                    "message": f"Dados JSON inválidos: {error_msg}"
                 }
             
-            sucesso = converter.json_to_excel_file(
-                dados_json, 
-                temp_path, 
-                nome_aba, 
+            # Gera a planilha em memória; os bytes vão crus e o base64 (quando
+            # houver) é gerado ao montar o corpo da resposta
+            excel_content = _run_conversion(
+                _convert_json_to_excel_bytes,
+                dados_json,
+                nome_aba,
                 aplicar_formatacao
             )
             
-            if not sucesso:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return {
+            if excel_content is None:
+                return 500, {
                     "status": "erro",
-                    "message": "Falha na conversão do JSON para Excel",
-                    "status_code": 500
+                    "message": "Falha na conversão do JSON para Excel"
                 }
             
-            # Lê e converte para base64
-            with open(temp_path, 'rb') as excel_file:
-                excel_content = excel_file.read()
-                excel_base64 = base64.b64encode(excel_content).decode('utf-8')
-            
-            os.unlink(temp_path)
-            
-            return {
+            return 200, {
                 "status": "sucesso",
                 "nome_arquivo": nome_arquivo,
-                "excel_base64": excel_base64,
+                "excel_base64": excel_content,
                 "tamanho": len(excel_content),
                 "registros": len(dados_json),
-                "timestamp": datetime.now().isoformat(),
-                "status_code": 200
+                "timestamp": _now_iso()
             }
             
         except Exception as e:
-            # Limpa arquivo temporário se houver erro
-            try:
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except:
-                pass
-            
-            return {
+            return 500, {
                 "status": "erro",
-                "message": f"Erro na conversão Excel: {str(e)}",
-                "status_code": 500
+                "message": f"Erro na conversão Excel: {str(e)}"
             }
 
     def handle_docx_to_pdf_conversion(self, data):
         """Handle DOCX to PDF conversion"""
         try:
-            # Tenta garantir que as dependências estão instaladas
-            global DocxToPdf
-            try:
-                # Testa se a classe funciona
-                test_converter = DocxToPdf()
-                if not hasattr(test_converter, 'convert_docx_content_to_pdf'):
-                    raise ImportError("Classe não funcional")
-            except:
-                # Tenta instalar dependências
-                if self.install_dependencies(['python-docx==1.2.0', 'reportlab==4.4.6']):
-                    try:
-                        from docx_to_pdf import DocxToPdf
-                    except ImportError as e:
-                        return {
-                            "status": "erro",
-                            "message": f"Erro ao importar DocxToPdf após instalação: {str(e)}",
-                            "status_code": 500
-                        }
-                else:
-                    return {
-                        "status": "erro", 
-                        "message": "Falha ao instalar dependências necessárias (python-docx, reportlab)",
-                        "status_code": 500
-                    }
+            # Dependências resolvidas uma única vez na carga do módulo
+            unavailable = _dependencies_unavailable('docx_pdf', 'DOCX->PDF')
+            if unavailable is not None:
+                return unavailable
             
             # Validação dos dados de entrada
             if not isinstance(data, dict):
-                return {
-                    "status": "erro",
-                    "message": "Dados devem ser um objeto JSON",
-                    "status_code": 400
-                }
-            
-            if 'arquivo_base64' not in data:
-                return {
-                    "status": "erro",
-                    "message": "Campo 'arquivo_base64' é obrigatório",
-                    "status_code": 400
-                }
-            
-            arquivo_base64 = data['arquivo_base64']
-            if not arquivo_base64:
-                return {
+                return 400, {
                     "status": "erro",
-                    "message": "Campo 'arquivo_base64' não pode estar vazio",
-                    "status_code": 400
+                    "message": "Dados devem ser um objeto JSON"
                 }
             
-            # Decodifica o arquivo base64
-            try:
-                arquivo_content = base64.b64decode(arquivo_base64)
+            arquivo_raw = data.get('_arquivo_raw')
+            if isinstance(arquivo_raw, bytes):
+                # Upload multipart: os bytes já chegaram crus, sem ida e volta pelo base64
+                arquivo_base64 = None
+                head = arquivo_raw[:len(DOCX_MAGIC)]
+            else:
+                if 'arquivo_base64' not in data:
+                    return 400, {
+                        "status": "erro",
+                        "message": "Campo 'arquivo_base64' é obrigatório"
+                    }
                 
-                # Verifica se o conteúdo parece ser um arquivo DOCX válido
-                if not arquivo_content.startswith(b'PK'):
-                    return {
+                arquivo_base64 = data['arquivo_base64']
+                if not arquivo_base64:
+                    return 400, {
                         "status": "erro",
-                        "message": "O arquivo enviado não parece ser um arquivo DOCX válido",
-                        "status_code": 400
+                        "message": "Campo 'arquivo_base64' não pode estar vazio"
                     }
-                    
-            except Exception as e:
-                return {
+                
+                if not isinstance(arquivo_base64, str):
+                    return 400, {
+                        "status": "erro",
+                        "message": "Campo 'arquivo_base64' deve ser uma string"
+                    }
+                
+                # Os 8 primeiros caracteres bastam para os 4 bytes da assinatura:
+                # arquivos que não são DOCX saem antes do decode completo. Espaços
+                # e quebras de linha (base64 quebrado em linhas, JSON formatado)
+                # são ignorados pelo decode, então saem também da amostra
+                try:
+                    head = _b64decode(''.join(arquivo_base64[:64].split())[:8])
+                except Exception:
+                    head = b''
+            
+            # Verifica a assinatura ZIP (PK\x03\x04) que todo arquivo DOCX tem
+            if not head.startswith(DOCX_MAGIC):
+                return 400, {
                     "status": "erro",
-                    "message": f"Erro ao decodificar arquivo base64: {str(e)}",
-                    "status_code": 400
+                    "message": "O arquivo enviado não parece ser um arquivo DOCX válido"
                 }
             
-            nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.pdf')
+            if arquivo_base64 is None:
+                arquivo_content = arquivo_raw
+            else:
+                # Decodifica o arquivo base64
+                try:
+                    arquivo_content = _b64decode(arquivo_base64)
+                except Exception as e:
+                    return 400, {
+                        "status": "erro",
+                        "message": f"Erro ao decodificar arquivo base64: {str(e)}"
+                    }
             
-            if not nome_arquivo.endswith('.pdf'):
-                nome_arquivo += '.pdf'
+            nome_arquivo = data.get('nome_arquivo')
+            invalid = _non_text_fields({'nome_arquivo': nome_arquivo})
+            if invalid is not None:
+                return invalid
             
-            # Arquivo temporário para o PDF
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_path = temp_file.name
+            # O nome padrão já sai com a extensão; só o nome do cliente é conferido
+            if nome_arquivo is None:
+                nome_arquivo = _default_filename('documento', '.pdf')
+            else:
+                nome_arquivo = _ensure_extension(nome_arquivo, '.pdf')
             
-            # Converte DOCX para PDF
-            converter = DocxToPdf()
-            sucesso = converter.convert_docx_content_to_pdf(arquivo_content, temp_path)
+            # Converte DOCX para PDF (stream local ou bytes vindos do pool)
+            pdf_stream = _run_conversion(_convert_docx_to_pdf_stream, arquivo_content)
             
-            if not sucesso:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return {
+            if pdf_stream is None:
+                return 500, {
                     "status": "erro",
-                    "message": "Falha na conversão do DOCX para PDF",
-                    "status_code": 500
+                    "message": "Falha na conversão do DOCX para PDF"
                 }
             
-            # Lê e converte para base64
-            with open(temp_path, 'rb') as pdf_file:
-                pdf_content = pdf_file.read()
-                pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-            
-            os.unlink(temp_path)
-            
-            return {
+            # O resultado vai na resposta e é codificado em base64 em blocos
+            return 200, {
                 "status": "sucesso",
                 "nome_arquivo": nome_arquivo,
-                "pdf_base64": pdf_base64,
-                "tamanho": len(pdf_content),
-                "timestamp": datetime.now().isoformat(),
-                "status_code": 200
+                "pdf_base64": pdf_stream,
+                "tamanho": _binary_length(pdf_stream),
+                "timestamp": _now_iso()
             }
             
         except Exception as e:
-            # Limpa arquivo temporário se houver erro
-            try:
-                if 'temp_path' in locals() and os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except:
-                pass
-            
-            return {
+            return 500, {
                 "status": "erro",
-                "message": f"Erro na conversão DOCX para PDF: {str(e)}",
-                "status_code": 500
+                "message": f"Erro na conversão DOCX para PDF: {str(e)}"
             }
 
+    # Rotas POST -> método que trata a conversão
+    POST_ROUTES = {
+        '/converter-markdown-pdf-base64': handle_pdf_conversion,
+        '/converter-markdown-docx-base64': handle_docx_conversion,
+        '/converter-json-excel-base64': handle_excel_conversion,
+        '/converter-docx-pdf-base64': handle_docx_to_pdf_conversion,
+    }
+    
+    # Rotas de download: mesmo handler da rota base64, mas a resposta é o arquivo
+    # binário (campo do payload e Content-Type), sem os 33% extras do base64
+    DOWNLOAD_ROUTES = {
+        '/converter-markdown-pdf': (handle_pdf_conversion, 'pdf_base64', 'application/pdf'),
+        '/converter-markdown-docx': (handle_docx_conversion, 'docx_base64', DOCX_MIMETYPE),
+        '/converter-json-excel': (handle_excel_conversion, 'excel_base64', XLSX_MIMETYPE),
+        '/converter-docx-pdf': (handle_docx_to_pdf_conversion, 'pdf_base64', 'application/pdf'),
+    }
+
 # Para desenvolvimento local
 if __name__ == "__main__":
-    from http.server import HTTPServer
-    server = HTTPServer(('localhost', 8000), handler)
+    from http.server import ThreadingHTTPServer
+    # Uma thread por requisição: conversões longas não bloqueiam as demais
+    # (os conversores compartilhados não guardam estado entre chamadas)
+    server = ThreadingHTTPServer(('localhost', 8000), handler)
+    server.daemon_threads = True
+    if CONVERSION_WORKERS > 0:
+        # Sobe e aquece os workers antes da primeira requisição
+        for _ in range(CONVERSION_WORKERS):
+            _get_pool().submit(int)
     print("Servidor rodando em http://localhost:8000")
     print("Rotas disponíveis:")
-    print("  GET  / - Status da API")
-    print("  GET  /verificar - Health check")
-    print("  POST /converter-markdown-pdf-base64 - Converter para PDF")
-    print("  POST /converter-markdown-docx-base64 - Converter para Word")
-    print("  POST /converter-json-excel-base64 - Converter para Excel")
+    # Mesma tabela das listas do GET e dos 404, com as rotas de download
+    for method, rota, descricao in _STATIC_ROTAS:
+        print(f"  {method:<4} {rota} - {descricao}")
     server.serve_forever()
\ No newline at end of file
@@ -1,16 +1,34 @@
 import json
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from itertools import chain, islice
 import os
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union, BinaryIO
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# openpyxl é importado no primeiro uso (ver _load_dependencies): quem importa o
+# módulo sem converter nada não paga por ele no cold start
+_DEPENDENCIES_LOADED = False
+
+
+def _load_dependencies():
+    """Importa openpyxl como globais do módulo, uma única vez"""
+    global _DEPENDENCIES_LOADED
+    global Workbook, WriteOnlyCell, Font, PatternFill, Alignment, Border, Side, NamedStyle
+    global get_column_letter
+    
+    if _DEPENDENCIES_LOADED:
+        return
+    
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+    from openpyxl.utils import get_column_letter
+    
+    _DEPENDENCIES_LOADED = True
+
 
 class JsonToExcel:
     """
@@ -18,48 +36,58 @@ class JsonToExcel:
     Versão otimizada para ambiente serverless (Vercel).
     """
     
+    # Estilos compartilhados por todas as instâncias, criados no primeiro uso
+    _styles_ready = False
+    
     def __init__(self):
         """
         Inicializa o conversor.
         """
         self.workbook = None
         
-    def _setup_default_styles(self):
+    @classmethod
+    def _setup_default_styles(cls):
         """
         Define estilos padrão para a planilha.
+        
+        Os objetos de estilo do openpyxl são imutáveis, então são criados
+        uma única vez e guardados na classe.
         """
+        if cls._styles_ready:
+            return
+        
         # Estilo para cabeçalhos
-        self.header_font = Font(
+        cls.header_font = Font(
             name='Calibri',
             size=12,
             bold=True,
             color='FFFFFF'
         )
         
-        self.header_fill = PatternFill(
+        cls.header_fill = PatternFill(
             start_color='4472C4',
             end_color='4472C4',
             fill_type='solid'
         )
         
-        self.header_alignment = Alignment(
+        cls.header_alignment = Alignment(
             horizontal='center',
             vertical='center'
         )
         
         # Estilo para dados
-        self.data_font = Font(
+        cls.data_font = Font(
             name='Calibri',
             size=11
         )
         
-        self.data_alignment = Alignment(
+        cls.data_alignment = Alignment(
             horizontal='left',
             vertical='center'
         )
         
         # Bordas
-        self.border = Border(
+        cls.border = Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
             top=Side(style='thin'),
@@ -67,66 +95,147 @@ class JsonToExcel:
         )
         
         # Estilo para linhas alternadas
-        self.alt_fill = PatternFill(
+        cls.alt_fill = PatternFill(
             start_color='F2F2F2',
             end_color='F2F2F2',
             fill_type='solid'
         )
+        
+        cls._styles_ready = True
     
-    def _apply_formatting(self, worksheet, data_rows: int):
+    def _register_named_styles(self, workbook):
         """
-        Aplica formatação à planilha.
+        Registra no workbook os estilos nomeados do cabeçalho e dos dados.
+        
+        Os NamedStyle são criados por workbook (cada um guarda os índices de
+        estilo do workbook em que foi registrado), a partir dos objetos de
+        estilo compartilhados da classe.
         
         Args:
-            worksheet: Planilha do openpyxl
-            data_rows: Número de linhas de dados
+            workbook: Workbook do openpyxl
         """
-        try:
-            # Formatação do cabeçalho
-            for cell in worksheet[1]:
-                cell.font = self.header_font
-                cell.fill = self.header_fill
-                cell.alignment = self.header_alignment
-                cell.border = self.border
-            
-            # Formatação dos dados
-            for row_idx in range(2, data_rows + 2):
-                for cell in worksheet[row_idx]:
-                    cell.font = self.data_font
-                    cell.alignment = self.data_alignment
-                    cell.border = self.border
-                    
-                    # Linhas alternadas
-                    if row_idx % 2 == 0:
-                        cell.fill = self.alt_fill
-            
-            # Ajusta largura das colunas
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
+        if 'header_style' in workbook.named_styles:
+            return
+        
+        workbook.add_named_style(NamedStyle(
+            name='header_style',
+            font=self.header_font,
+            fill=self.header_fill,
+            alignment=self.header_alignment,
+            border=self.border
+        ))
+        workbook.add_named_style(NamedStyle(
+            name='data_style',
+            font=self.data_font,
+            alignment=self.data_alignment,
+            border=self.border
+        ))
+        workbook.add_named_style(NamedStyle(
+            name='data_alt_style',
+            font=self.data_font,
+            fill=self.alt_fill,
+            alignment=self.data_alignment,
+            border=self.border
+        ))
+    
+    @staticmethod
+    def _table_rows(json_data: List[Dict[str, Any]]) -> Tuple[List[str], List[List[Any]]]:
+        """
+        Monta cabeçalho e linhas direto dos dicionários, sem DataFrame.
+        
+        As colunas são a união das chaves, na ordem em que aparecem; chave
+        ausente num item vira célula vazia.
+        
+        Args:
+            json_data: Lista de dicionários com os dados
+            
+        Returns:
+            tuple: (colunas, linhas)
+        """
+        columns = list(dict.fromkeys(key for item in json_data for key in item))
+        rows = [[item.get(key) for key in columns] for item in json_data]
+        return columns, rows
+    
+    @staticmethod
+    def _column_widths(columns: List[str], rows: List[List[Any]]) -> List[int]:
+        """
+        Calcula a largura de cada coluna (cabeçalho e valores) numa única passada
+        pelos dados, antes de gravar a planilha.
+        
+        Args:
+            columns: Nomes das colunas
+            rows: Linhas de dados
+            
+        Returns:
+            List[int]: Largura de cada coluna, entre 10 e 50
+        """
+        widths = []
+        for name, values in zip(columns, zip(*rows)):
+            max_length = max(len(str(name)), max(map(len, map(str, values))))
+            widths.append(min(max(max_length + 2, 10), 50))
+        return widths
+    
+    def _write_rows(self, worksheet, columns: List[str], rows: List[List[Any]], apply_formatting: bool):
+        """
+        Grava cabeçalho e dados na planilha (workbook write_only).
+        
+        No modo write_only as linhas vão direto para o arquivo e não podem ser
+        alteradas depois, então larguras e estilos são definidos antes e durante
+        a escrita. Cada coluna tem uma célula-modelo por estilo, reaproveitada
+        em todas as linhas.
+        
+        Args:
+            worksheet: Planilha write_only do openpyxl
+            columns: Nomes das colunas
+            rows: Linhas de dados
+            apply_formatting: Se deve aplicar formatação
+        """
+        if apply_formatting:
+            try:
+                # Estilos nomeados: uma atribuição por célula em vez de quatro
+                self._register_named_styles(worksheet.parent)
                 
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
+                # Larguras das colunas precisam existir antes da primeira linha
+                for col_idx, width in enumerate(self._column_widths(columns, rows), 1):
+                    worksheet.column_dimensions[get_column_letter(col_idx)].width = width
                 
-                # Define largura mínima e máxima
-                adjusted_width = min(max(max_length + 2, 10), 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        except Exception as e:
-            # Se a formatação falhar, continua sem formatação
-            logger.warning(f"Erro na formatação: {str(e)}")
+                templates = {}
+                for style in ('header_style', 'data_style', 'data_alt_style'):
+                    templates[style] = []
+                    for _ in columns:
+                        cell = WriteOnlyCell(worksheet)
+                        cell.style = style
+                        templates[style].append(cell)
+            except Exception as e:
+                # Se a formatação falhar, continua sem formatação
+                logger.warning(f"Erro na formatação: {str(e)}")
+                apply_formatting = False
+        
+        if not apply_formatting:
+            worksheet.append(columns)
+            for r in rows:
+                worksheet.append(r)
+            return
+        
+        # Cabeçalho e linhas de dados alternadas com fundo cinza
+        for row_idx, r in enumerate(chain((columns,), rows), 1):
+            if row_idx == 1:
+                cells = templates['header_style']
+            else:
+                cells = templates['data_alt_style' if row_idx % 2 == 0 else 'data_style']
+            for cell, value in zip(cells, r):
+                cell.value = value
+            worksheet.append(cells)
     
-    def json_to_excel_file(self, json_data: List[Dict[str, Any]], output_path: str, 
+    def json_to_excel_file(self, json_data: List[Dict[str, Any]], output_path: Union[str, BinaryIO], 
                           sheet_name: str = "Dados", apply_formatting: bool = True) -> bool:
         """
         Converte dados JSON para arquivo Excel.
         
         Args:
             json_data: Lista de dicionários com os dados
-            output_path: Caminho onde salvar o arquivo Excel
+            output_path: Caminho onde salvar o arquivo Excel ou stream binário
+                (ex.: io.BytesIO) que receberá os bytes do .xlsx
             sheet_name: Nome da aba na planilha
             apply_formatting: Se deve aplicar formatação
             
@@ -140,31 +249,31 @@ class JsonToExcel:
                 logger.error("Dados JSON devem ser uma lista não vazia")
                 return False
             
-            # Converte para DataFrame do pandas
-            df = pd.DataFrame(json_data)
+            _load_dependencies()
             
-            # Cria workbook
-            self.workbook = Workbook()
-            worksheet = self.workbook.active
-            worksheet.title = sheet_name[:31]  # Excel limita nomes de aba a 31 caracteres
+            # Cabeçalho e linhas direto dos dicionários
+            columns, rows = self._table_rows(json_data)
+            
+            # Cria workbook em modo write_only: as linhas são gravadas à medida que
+            # chegam, sem manter um objeto Cell por célula na memória
+            self.workbook = Workbook(write_only=True)
+            worksheet = self.workbook.create_sheet(title=sheet_name[:31])  # Excel limita nomes de aba a 31 caracteres
             
             # Configura estilos se necessário
             if apply_formatting:
                 self._setup_default_styles()
             
-            # Adiciona dados à planilha
-            for r in dataframe_to_rows(df, index=False, header=True):
-                worksheet.append(r)
-            
-            # Aplica formatação se solicitada
-            if apply_formatting:
-                self._apply_formatting(worksheet, len(df))
+            # Adiciona dados (já formatados, se solicitado) à planilha
+            self._write_rows(worksheet, columns, rows, apply_formatting)
             
             # Salva o arquivo
             self.workbook.save(output_path)
             
-            logger.info(f"Planilha Excel gerada com sucesso: {output_path}")
-            logger.info(f"Dados processados: {len(df)} linhas, {len(df.columns)} colunas")
+            if isinstance(output_path, str):
+                logger.info(f"Planilha Excel gerada com sucesso: {output_path}")
+            else:
+                logger.info("Planilha Excel gerada com sucesso em memória")
+            logger.info(f"Dados processados: {len(rows)} linhas, {len(columns)} colunas")
             
             return True
             
@@ -191,20 +300,22 @@ class JsonToExcel:
             if not json_data:
                 return False, "Lista de dados não pode estar vazia"
             
-            # Verifica se todos os itens são dicionários
-            for i, item in enumerate(json_data):
-                if not isinstance(item, dict):
-                    return False, f"Item {i} não é um dicionário válido"
-            
-            # Verifica se todos os dicionários têm chaves consistentes
-            if json_data:
-                first_keys = set(json_data[0].keys()) if json_data[0] else set()
-                for i, item in enumerate(json_data[1:], 1):
-                    current_keys = set(item.keys()) if item else set()
-                    if current_keys != first_keys:
-                        # Permite chaves diferentes se não for muito divergente
-                        if len(current_keys.symmetric_difference(first_keys)) > len(first_keys) * 0.5:
-                            return False, f"Item {i} tem chaves muito diferentes do primeiro item"
+            # Verifica se todos os itens são dicionários (o índice só é
+            # procurado quando algum item falha)
+            if not all(isinstance(item, dict) for item in json_data):
+                i = next(i for i, item in enumerate(json_data) if not isinstance(item, dict))
+                return False, f"Item {i} não é um dicionário válido"
+            
+            # Verifica se todos os dicionários têm chaves consistentes; as views
+            # de chaves já se comparam como conjuntos, sem criar um set por item
+            first_keys = json_data[0].keys()
+            max_difference = len(first_keys) * 0.5
+            for i, item in enumerate(islice(json_data, 1, None), 1):
+                current_keys = item.keys()
+                if current_keys != first_keys:
+                    # Permite chaves diferentes se não for muito divergente
+                    if len(current_keys ^ first_keys) > max_difference:
+                        return False, f"Item {i} tem chaves muito diferentes do primeiro item"
             
             return True, "Dados válidos"
             
@@ -1,23 +1,28 @@
 import markdown2
-from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted, Image, Table, TableStyle
-from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
+from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT
 from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-from reportlab.lib.colors import HexColor
 import re
 import os
-import argparse
 import logging
-from typing import Optional, List
+from typing import Optional, List, Union, BinaryIO
 from pathlib import Path
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Regexes de _clean_html_tags compiladas uma vez (chamada para cada linha do HTML)
+_BLOCK_TAG_RE = re.compile(r'<(?:p|li|ul|ol|h[1-6]|blockquote).*?>|</(?:p|li|ul|ol|h[1-6]|blockquote)>')
+_INLINE_FORMAT_RES = (
+    (re.compile(r'<strong>(.*?)</strong>'), r'<b>\1</b>'),
+    (re.compile(r'<em>(.*?)</em>'), r'<i>\1</i>'),
+    (re.compile(r'<code>(.*?)</code>'), r'<font name="Courier" size="9">\1</font>'),
+)
+_ANY_TAG_RE = re.compile(r'<[^>]+>')
+
 
 class MarkdownToPDFReportLab:
     """
@@ -25,6 +30,9 @@ class MarkdownToPDFReportLab:
     Compatível com Windows e não requer dependências externas complexas.
     """
     
+    # Folha de estilos compartilhada (ver _get_styles)
+    _shared_styles = None
+    
     def __init__(self, page_size=A4):
         """
         Inicializa o conversor.
@@ -33,17 +41,32 @@ class MarkdownToPDFReportLab:
             page_size: Tamanho da página (A4, letter, etc.)
         """
         self.page_size = page_size
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        self.styles = self._get_styles()
         
-    def _setup_custom_styles(self):
+    @classmethod
+    def _get_styles(cls):
+        """
+        Folha de estilos (padrão do ReportLab + customizados), montada uma vez
+        por processo e compartilhada entre as instâncias; ninguém a altera
+        depois de pronta.
+        """
+        if cls._shared_styles is None:
+            cls._shared_styles = getSampleStyleSheet()
+            cls._setup_custom_styles(cls._shared_styles)
+        return cls._shared_styles
+    
+    @staticmethod
+    def _setup_custom_styles(styles):
         """
         Configura estilos customizados para o PDF.
+        
+        Args:
+            styles: Folha de estilos que recebe os estilos customizados
         """
         # Estilo para título principal
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=24,
             spaceAfter=30,
             textColor=colors.HexColor('#2c3e50'),
@@ -52,9 +75,9 @@ class MarkdownToPDFReportLab:
         ))
         
         # Estilo para subtítulos
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomHeading2',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=18,
             spaceAfter=20,
             textColor=colors.HexColor('#34495e'),
@@ -63,9 +86,9 @@ class MarkdownToPDFReportLab:
         ))
         
         # Estilo para heading 3
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomHeading3',
-            parent=self.styles['Heading3'],
+            parent=styles['Heading3'],
             fontSize=14,
             spaceAfter=15,
             textColor=colors.HexColor('#34495e'),
@@ -74,9 +97,9 @@ class MarkdownToPDFReportLab:
         ))
         
         # Estilo para texto normal
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomNormal',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=12,
             textColor=colors.black,
@@ -85,9 +108,9 @@ class MarkdownToPDFReportLab:
         ))
         
         # Estilo para código
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomCode',
-            parent=self.styles['Code'],
+            parent=styles['Code'],
             fontSize=9,
             spaceAfter=12,
             leftIndent=20,
@@ -99,9 +122,9 @@ class MarkdownToPDFReportLab:
         ))
         
         # Estilo para citações
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomQuote',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             leftIndent=30,
             rightIndent=30,
@@ -272,37 +295,30 @@ class MarkdownToPDFReportLab:
         Returns:
             str: Texto limpo com formatação ReportLab
         """
+        # Linhas sem nenhuma tag não precisam passar pelas regexes
+        if '<' not in text:
+            return text.strip()
+        
         # Remove tags básicas
-        text = re.sub(r'<p.*?>', '', text)
-        text = re.sub(r'</p>', '', text)
-        text = re.sub(r'<li.*?>', '', text)
-        text = re.sub(r'</li>', '', text)
-        text = re.sub(r'<ul.*?>', '', text)
-        text = re.sub(r'</ul>', '', text)
-        text = re.sub(r'<ol.*?>', '', text)
-        text = re.sub(r'</ol>', '', text)
-        text = re.sub(r'<h[1-6].*?>', '', text)
-        text = re.sub(r'</h[1-6]>', '', text)
-        text = re.sub(r'<blockquote.*?>', '', text)
-        text = re.sub(r'</blockquote>', '', text)
+        text = _BLOCK_TAG_RE.sub('', text)
         
         # Converte formatação para ReportLab
-        text = re.sub(r'<strong>(.*?)</strong>', r'<b>\1</b>', text)
-        text = re.sub(r'<em>(.*?)</em>', r'<i>\1</i>', text)
-        text = re.sub(r'<code>(.*?)</code>', r'<font name="Courier" size="9">\1</font>', text)
+        for pattern, replacement in _INLINE_FORMAT_RES:
+            text = pattern.sub(replacement, text)
         
         # Remove outras tags não suportadas
-        text = re.sub(r'<[^>]+>', '', text)
+        text = _ANY_TAG_RE.sub('', text)
         
         return text.strip()
     
-    def markdown_text_to_pdf(self, markdown_text: str, output_path: str) -> bool:
+    def markdown_text_to_pdf(self, markdown_text: str, output_path: Union[str, BinaryIO]) -> bool:
         """
         Converte texto Markdown diretamente para PDF.
         
         Args:
             markdown_text (str): Texto em formato Markdown
-            output_path (str): Caminho onde salvar o PDF gerado
+            output_path (str | BinaryIO): Caminho onde salvar o PDF gerado ou
+                stream binário (ex.: io.BytesIO) que receberá os bytes do PDF
             
         Returns:
             bool: True se a conversão foi bem-sucedida, False caso contrário
@@ -326,7 +342,10 @@ class MarkdownToPDFReportLab:
             # Constrói o PDF
             doc.build(elements)
             
-            logger.info(f"PDF gerado com sucesso: {output_path}")
+            if isinstance(output_path, str):
+                logger.info(f"PDF gerado com sucesso: {output_path}")
+            else:
+                logger.info("PDF gerado com sucesso em memória")
             return True
             
         except Exception as e:
@@ -1,22 +1,58 @@
-from flask import Flask, request, jsonify, send_file, make_response
+from flask import Flask, Response, request, jsonify, send_file, make_response
 # Importa as funções principais e URL
 from markdown_to_pdf_reportlab import MarkdownToPDFReportLab
 from markdown_to_docx import MarkdownToDocx
 from json_to_excel import JsonToExcel
 from docx_to_pdf import DocxToPdf
 import traceback 
-import os   
 import logging
-import uuid
-import tempfile
+import secrets
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 from io import BytesIO
 import base64
+import json
+
+# pybase64 usa SIMD (SSSE3/AVX2) e é bem mais rápido para PDFs grandes
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+_b64encode = pybase64.b64encode if PYBASE64_AVAILABLE else base64.b64encode
 
 
 # Inicializa o app Flask
 app = Flask(__name__)
+
+# Conversor Markdown -> PDF compartilhado entre requisições: a folha de estilos
+# do ReportLab é montada uma vez e a instância não guarda estado por chamada
+_PDF_CONVERTER = MarkdownToPDFReportLab()
+
+
+def _ensure_extension(nome_arquivo, extension):
+    """Garante a extensão no nome do arquivo (sem diferenciar maiúsculas: '.PDF' já vale)"""
+    if nome_arquivo[-len(extension):].lower() == extension:
+        return nome_arquivo
+    return nome_arquivo + extension
+
+
+def _json_base64_response(payload, field, content):
+    """
+    Monta a resposta JSON com 'field' = base64 de 'content', encaixando os bytes
+    do base64 entre prefixo e sufixo já serializados (sem str intermediária nem
+    nova passada do json.dumps sobre megabytes de base64).
+    """
+    # O marcador vai no último campo; rsplit não se confunde com valores do cliente
+    marker = json.dumps('\x00').encode('utf-8')
+    envelope = json.dumps({**payload, field: '\x00'}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    prefix, suffix = envelope.rsplit(marker, 1)
+    return Response(
+        [prefix, b'"', _b64encode(content), b'"', suffix],
+        mimetype='application/json'
+    )
+
 # Configuração de logs
     
 
@@ -58,28 +94,24 @@ def converter_markdown_para_pdf_api():
             }), 400
         
         texto_markdown = data['texto_markdown']
-        nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.pdf')
-        
-        # Garante que o arquivo tem extensão .pdf
-        if not nome_arquivo.endswith('.pdf'):
-            nome_arquivo += '.pdf'
+        nome_arquivo = data.get('nome_arquivo')
+        if nome_arquivo is None:
+            # O nome padrão já sai com a extensão
+            nome_arquivo = f'documento_{secrets.token_hex(4)}.pdf'
+        else:
+            # Garante que o arquivo tem extensão .pdf
+            nome_arquivo = _ensure_extension(nome_arquivo, '.pdf')
         
         logging.info(f"Iniciando conversão para arquivo: {nome_arquivo}")
         logging.info(f"Tamanho do texto: {len(texto_markdown)} caracteres")
         
-        # Cria arquivo temporário para o PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_path = temp_file.name
+        # Gera o PDF em memória, sem passar por arquivo temporário
+        pdf_buffer = BytesIO()
         
         # Converte o Markdown para PDF
-        converter = MarkdownToPDFReportLab()
-        sucesso = converter.markdown_text_to_pdf(texto_markdown, temp_path)
+        sucesso = _PDF_CONVERTER.markdown_text_to_pdf(texto_markdown, pdf_buffer)
         
         if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do Markdown para PDF"
@@ -88,15 +120,9 @@ def converter_markdown_para_pdf_api():
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo}")
         
         # Retorna o arquivo PDF como download
-        def remove_file(response):
-            try:
-                os.unlink(temp_path)
-            except Exception:
-                pass
-            return response
-        
+        pdf_buffer.seek(0)
         return send_file(
-            temp_path,
+            pdf_buffer,
             as_attachment=True,
             download_name=nome_arquivo,
             mimetype='application/pdf'
@@ -106,13 +132,6 @@ def converter_markdown_para_pdf_api():
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -157,61 +176,43 @@ def converter_markdown_para_pdf_base64():
             }), 400
         
         texto_markdown = data['texto_markdown']
-        nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.pdf')
-        
-        # Garante que o arquivo tem extensão .pdf
-        if not nome_arquivo.endswith('.pdf'):
-            nome_arquivo += '.pdf'
+        nome_arquivo = data.get('nome_arquivo')
+        if nome_arquivo is None:
+            # O nome padrão já sai com a extensão
+            nome_arquivo = f'documento_{secrets.token_hex(4)}.pdf'
+        else:
+            # Garante que o arquivo tem extensão .pdf
+            nome_arquivo = _ensure_extension(nome_arquivo, '.pdf')
         
         logging.info(f"Iniciando conversão para arquivo: {nome_arquivo}")
         
-        # Cria arquivo temporário para o PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_path = temp_file.name
+        # Gera o PDF em memória, sem passar por arquivo temporário
+        pdf_buffer = BytesIO()
         
         # Converte o Markdown para PDF
-        converter = MarkdownToPDFReportLab()
-        sucesso = converter.markdown_text_to_pdf(texto_markdown, temp_path)
+        sucesso = _PDF_CONVERTER.markdown_text_to_pdf(texto_markdown, pdf_buffer)
         
         if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do Markdown para PDF"
             }), 500
         
-        # Lê o arquivo PDF e converte para base64
-        import base64
-        with open(temp_path, 'rb') as pdf_file:
-            pdf_content = pdf_file.read()
-            pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-        
-        # Remove arquivo temporário
-        os.unlink(temp_path)
+        # Converte o PDF para base64 direto do buffer
+        pdf_content = pdf_buffer.getbuffer()
         
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo} ({len(pdf_content)} bytes)")
         
-        return jsonify({
+        return _json_base64_response({
             "status": "sucesso",
             "nome_arquivo": nome_arquivo,
-            "pdf_base64": pdf_base64,
             "tamanho": len(pdf_content)
-        }), 200
+        }, "pdf_base64", pdf_content), 200
         
     except Exception as e:
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -250,28 +251,25 @@ def converter_markdown_para_docx_api():
             }), 400
         
         texto_markdown = data['texto_markdown']
-        nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.docx')
-        
-        # Garante que o arquivo tem extensão .docx
-        if not nome_arquivo.endswith('.docx'):
-            nome_arquivo += '.docx'
+        nome_arquivo = data.get('nome_arquivo')
+        if nome_arquivo is None:
+            # O nome padrão já sai com a extensão
+            nome_arquivo = f'documento_{secrets.token_hex(4)}.docx'
+        else:
+            # Garante que o arquivo tem extensão .docx
+            nome_arquivo = _ensure_extension(nome_arquivo, '.docx')
         
         logging.info(f"Iniciando conversão para arquivo: {nome_arquivo}")
         logging.info(f"Tamanho do texto: {len(texto_markdown)} caracteres")
         
-        # Cria arquivo temporário para o Word
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-            temp_path = temp_file.name
+        # Gera o Word em memória, sem passar por arquivo temporário
+        docx_buffer = BytesIO()
         
         # Converte o Markdown para Word
         converter = MarkdownToDocx()
-        sucesso = converter.markdown_text_to_docx(texto_markdown, temp_path)
+        sucesso = converter.markdown_text_to_docx(texto_markdown, docx_buffer)
         
         if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do Markdown para Word"
@@ -280,8 +278,9 @@ def converter_markdown_para_docx_api():
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo}")
         
         # Retorna o arquivo Word como download
+        docx_buffer.seek(0)
         return send_file(
-            temp_path,
+            docx_buffer,
             as_attachment=True,
             download_name=nome_arquivo,
             mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
@@ -291,13 +290,6 @@ def converter_markdown_para_docx_api():
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -342,61 +334,38 @@ def converter_markdown_para_docx_base64():
             }), 400
         
         texto_markdown = data['texto_markdown']
-        nome_arquivo = data.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.docx')
-        
-        # Garante que o arquivo tem extensão .docx
-        if not nome_arquivo.endswith('.docx'):
-            nome_arquivo += '.docx'
+        nome_arquivo = data.get('nome_arquivo')
+        if nome_arquivo is None:
+            # O nome padrão já sai com a extensão
+            nome_arquivo = f'documento_{secrets.token_hex(4)}.docx'
+        else:
+            # Garante que o arquivo tem extensão .docx
+            nome_arquivo = _ensure_extension(nome_arquivo, '.docx')
         
         logging.info(f"Iniciando conversão para arquivo: {nome_arquivo}")
         
-        # Cria arquivo temporário para o Word
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-            temp_path = temp_file.name
-        
-        # Converte o Markdown para Word
+        # Gera o Word em memória, sem passar por arquivo temporário
         converter = MarkdownToDocx()
-        sucesso = converter.markdown_text_to_docx(texto_markdown, temp_path)
+        docx_content = converter.markdown_text_to_docx_bytes(texto_markdown)
         
-        if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            
+        if docx_content is None:
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do Markdown para Word"
             }), 500
         
-        # Lê o arquivo Word e converte para base64
-        import base64
-        with open(temp_path, 'rb') as docx_file:
-            docx_content = docx_file.read()
-            docx_base64 = base64.b64encode(docx_content).decode('utf-8')
-        
-        # Remove arquivo temporário
-        os.unlink(temp_path)
-        
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo} ({len(docx_content)} bytes)")
         
-        return jsonify({
+        return _json_base64_response({
             "status": "sucesso",
             "nome_arquivo": nome_arquivo,
-            "docx_base64": docx_base64,
             "tamanho": len(docx_content)
-        }), 200
+        }, "docx_base64", docx_content), 200
         
     except Exception as e:
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -437,21 +406,19 @@ def converter_json_para_excel_api():
             }), 400
         
         dados_json = data['dados_json']
-        nome_arquivo = data.get('nome_arquivo', f'planilha_{uuid.uuid4().hex[:8]}.xlsx')
+        nome_arquivo = data.get('nome_arquivo')
+        if nome_arquivo is None:
+            # O nome padrão já sai com a extensão
+            nome_arquivo = f'planilha_{secrets.token_hex(4)}.xlsx'
+        else:
+            # Garante que o arquivo tem extensão .xlsx
+            nome_arquivo = _ensure_extension(nome_arquivo, '.xlsx')
         nome_aba = data.get('nome_aba', 'Dados')
         aplicar_formatacao = data.get('aplicar_formatacao', True)
         
-        # Garante que o arquivo tem extensão .xlsx
-        if not nome_arquivo.endswith('.xlsx'):
-            nome_arquivo += '.xlsx'
-        
         logging.info(f"Iniciando conversão para arquivo: {nome_arquivo}")
         logging.info(f"Número de registros: {len(dados_json)}")
         
-        # Cria arquivo temporário para o Excel
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
-            temp_path = temp_file.name
-        
         # Converte JSON para Excel
         converter = JsonToExcel()
         
@@ -463,18 +430,16 @@ def converter_json_para_excel_api():
                 "mensagem": f"Dados JSON inválidos: {error_msg}"
             }), 400
         
+        # Gera a planilha em memória, sem passar por arquivo temporário
+        excel_buffer = BytesIO()
         sucesso = converter.json_to_excel_file(
             dados_json, 
-            temp_path, 
+            excel_buffer, 
             nome_aba, 
             aplicar_formatacao
         )
         
         if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do JSON para Excel"
@@ -483,8 +448,9 @@ def converter_json_para_excel_api():
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo}")
         
         # Retorna o arquivo Excel como download
+        excel_buffer.seek(0)
         return send_file(
-            temp_path,
+            excel_buffer,
             as_attachment=True,
             download_name=nome_arquivo,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -494,13 +460,6 @@ def converter_json_para_excel_api():
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -547,20 +506,18 @@ def converter_json_para_excel_base64():
             }), 400
         
         dados_json = data['dados_json']
-        nome_arquivo = data.get('nome_arquivo', f'planilha_{uuid.uuid4().hex[:8]}.xlsx')
+        nome_arquivo = data.get('nome_arquivo')
+        if nome_arquivo is None:
+            # O nome padrão já sai com a extensão
+            nome_arquivo = f'planilha_{secrets.token_hex(4)}.xlsx'
+        else:
+            # Garante que o arquivo tem extensão .xlsx
+            nome_arquivo = _ensure_extension(nome_arquivo, '.xlsx')
         nome_aba = data.get('nome_aba', 'Dados')
         aplicar_formatacao = data.get('aplicar_formatacao', True)
         
-        # Garante que o arquivo tem extensão .xlsx
-        if not nome_arquivo.endswith('.xlsx'):
-            nome_arquivo += '.xlsx'
-        
         logging.info(f"Iniciando conversão para arquivo: {nome_arquivo}")
         
-        # Cria arquivo temporário para o Excel
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
-            temp_path = temp_file.name
-        
         # Converte JSON para Excel
         converter = JsonToExcel()
         
@@ -572,53 +529,37 @@ def converter_json_para_excel_base64():
                 "mensagem": f"Dados JSON inválidos: {error_msg}"
             }), 400
         
+        # Gera a planilha em memória, sem passar por arquivo temporário
+        excel_buffer = BytesIO()
         sucesso = converter.json_to_excel_file(
             dados_json, 
-            temp_path, 
+            excel_buffer, 
             nome_aba, 
             aplicar_formatacao
         )
         
         if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do JSON para Excel"
             }), 500
         
-        # Lê o arquivo Excel e converte para base64
-        import base64
-        with open(temp_path, 'rb') as excel_file:
-            excel_content = excel_file.read()
-            excel_base64 = base64.b64encode(excel_content).decode('utf-8')
-        
-        # Remove arquivo temporário
-        os.unlink(temp_path)
+        # Converte o Excel para base64 direto do buffer
+        excel_content = excel_buffer.getbuffer()
         
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo} ({len(excel_content)} bytes)")
         
-        return jsonify({
+        return _json_base64_response({
             "status": "sucesso",
             "nome_arquivo": nome_arquivo,
-            "excel_base64": excel_base64,
             "tamanho": len(excel_content),
             "registros": len(dados_json)
-        }), 200
+        }, "excel_base64", excel_content), 200
         
     except Exception as e:
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -662,9 +603,12 @@ def converter_docx_para_pdf_api():
             }), 400
         
         # Nome do arquivo de saída
-        nome_arquivo_saida = request.form.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.pdf')
-        if not nome_arquivo_saida.endswith('.pdf'):
-            nome_arquivo_saida += '.pdf'
+        nome_arquivo_saida = request.form.get('nome_arquivo')
+        if nome_arquivo_saida is None:
+            nome_arquivo_saida = f'documento_{secrets.token_hex(4)}.pdf'
+        else:
+            # Garante que o arquivo tem extensão .pdf
+            nome_arquivo_saida = _ensure_extension(nome_arquivo_saida, '.pdf')
         
         logging.info(f"Arquivo recebido: {arquivo.filename}")
         logging.info(f"Arquivo de saída: {nome_arquivo_saida}")
@@ -672,19 +616,11 @@ def converter_docx_para_pdf_api():
         # Lê o conteúdo do arquivo
         arquivo_content = arquivo.read()
         
-        # Cria arquivo temporário para o PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-        
-        # Converte DOCX para PDF
+        # Converte DOCX para PDF (em memória, ou em disco se for grande)
         converter = DocxToPdf()
-        sucesso = converter.convert_docx_content_to_pdf(arquivo_content, temp_pdf_path)
+        pdf_stream = converter.convert_docx_content_to_stream(arquivo_content)
         
-        if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-            
+        if pdf_stream is None:
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do arquivo para PDF"
@@ -692,16 +628,9 @@ def converter_docx_para_pdf_api():
         
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo_saida}")
         
-        # Retorna o arquivo PDF como download
-        def remove_file(response):
-            try:
-                os.unlink(temp_pdf_path)
-            except Exception:
-                pass
-            return response
-        
+        # Envia o PDF direto do stream; o Flask o fecha ao final da resposta
         return send_file(
-            temp_pdf_path,
+            pdf_stream,
             as_attachment=True,
             download_name=nome_arquivo_saida,
             mimetype='application/pdf'
@@ -711,13 +640,6 @@ def converter_docx_para_pdf_api():
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_pdf_path' in locals() and os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -767,9 +689,12 @@ def converter_docx_para_pdf_base64():
             }), 400
         
         # Nome do arquivo de saída
-        nome_arquivo_saida = request.form.get('nome_arquivo', f'documento_{uuid.uuid4().hex[:8]}.pdf')
-        if not nome_arquivo_saida.endswith('.pdf'):
-            nome_arquivo_saida += '.pdf'
+        nome_arquivo_saida = request.form.get('nome_arquivo')
+        if nome_arquivo_saida is None:
+            nome_arquivo_saida = f'documento_{secrets.token_hex(4)}.pdf'
+        else:
+            # Garante que o arquivo tem extensão .pdf
+            nome_arquivo_saida = _ensure_extension(nome_arquivo_saida, '.pdf')
         
         logging.info(f"Arquivo recebido: {arquivo.filename}")
         logging.info(f"Arquivo de saída: {nome_arquivo_saida}")
@@ -777,52 +702,32 @@ def converter_docx_para_pdf_base64():
         # Lê o conteúdo do arquivo
         arquivo_content = arquivo.read()
         
-        # Cria arquivo temporário para o PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-        
-        # Converte DOCX para PDF
+        # Converte DOCX para PDF (em memória, ou em disco se for grande)
         converter = DocxToPdf()
-        sucesso = converter.convert_docx_content_to_pdf(arquivo_content, temp_pdf_path)
+        pdf_stream = converter.convert_docx_content_to_stream(arquivo_content)
         
-        if not sucesso:
-            # Remove arquivo temporário se falhou
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-            
+        if pdf_stream is None:
             return jsonify({
                 "status": "erro",
                 "mensagem": "Falha na conversão do arquivo para PDF"
             }), 500
         
         # Lê o PDF gerado e converte para base64
-        with open(temp_pdf_path, 'rb') as pdf_file:
-            pdf_content = pdf_file.read()
-            pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-        
-        # Remove arquivo temporário
-        os.unlink(temp_pdf_path)
+        with pdf_stream:
+            pdf_content = pdf_stream.read()
         
         logging.info(f"Conversão realizada com sucesso: {nome_arquivo_saida}")
         
-        return jsonify({
+        return _json_base64_response({
             "status": "sucesso",
             "nome_arquivo": nome_arquivo_saida,
-            "pdf_base64": pdf_base64,
             "tamanho": len(pdf_content)
-        }), 200
+        }, "pdf_base64", pdf_content), 200
         
     except Exception as e:
         logging.error(f"Erro na conversão: {str(e)}")
         traceback.print_exc()
         
-        # Remove arquivo temporário se houve erro
-        try:
-            if 'temp_pdf_path' in locals() and os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-        except Exception:
-            pass
-        
         return jsonify({
             "status": "erro",
             "mensagem": f"Erro interno do servidor: {str(e)}"
@@ -2,130 +2,266 @@
 Módulo para conversão de arquivos DOC/DOCX para PDF usando python-docx e reportlab
 """
 
+import atexit
+import functools
+import html
+import io
+import itertools
 import os
+import re
+import shutil
+import subprocess
 import tempfile
+import unicodedata
 import logging
-from docx import Document
-from docx.shared import Inches
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+from pathlib import Path
+
+
+SOFFICE_TIMEOUT = 300
+
+# Buffer de leitura do DOCX: o zipfile faz muitas leituras pequenas no arquivo
+DOCX_READ_BUFFER_SIZE = 1 << 20
+
+# PDFs até este tamanho ficam em memória; acima disso vão para disco
+PDF_SPOOL_MAX_SIZE = 8 << 20
+
+# Substituição dos caracteres problemáticos (cp1252) numa única passada
+SPECIAL_CHARS_TABLE = str.maketrans({
+    '\x91': "'",   # Apostrofe curvo esquerdo
+    '\x92': "'",   # Apostrofe curvo direito
+    '\x93': '"',   # Aspas curvas esquerdas
+    '\x94': '"',   # Aspas curvas direitas
+    '\x96': '-',   # Hífen longo
+    '\x97': '--',  # Hífen extra longo
+})
+
+# Blocos do corpo do documento (parágrafos e tabelas)
+WORD_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+PARAGRAPH_TAG = f'{{{WORD_NAMESPACE}}}p'
+
+# Remove caracteres nulos, inválidos no XML dos parágrafos do ReportLab
+NUL_STRIP_TABLE = {0: None}
+
+# Classificação do parágrafo pelo nome do estilo, numa única busca
+STYLE_KIND_RE = re.compile(r'title|heading', re.IGNORECASE)
+
+# Perfis do LibreOffice deste processo, reaproveitados entre conversões para não
+# reinicializá-los a cada chamada. Um perfil não pode ser usado por duas
+# instâncias do soffice ao mesmo tempo: cada execução tira um perfil livre da
+# lista (ou cria um novo) e o devolve ao terminar, ou o descarta se o soffice falhou
+_soffice_profiles = []
+_idle_soffice_profiles = []
+
+
+def _acquire_soffice_profile():
+    """Perfil livre deste processo, criando um novo se todos estiverem em uso"""
+    try:
+        return _idle_soffice_profiles.pop()
+    except IndexError:
+        profile_dir = tempfile.mkdtemp(prefix='docx_to_pdf_soffice_profile_')
+        _soffice_profiles.append(profile_dir)
+        return profile_dir
+
+
+def _discard_soffice_profile(profile_dir):
+    """Remove um perfil que não deve ser reaproveitado"""
+    _soffice_profiles.remove(profile_dir)
+    shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def _forget_soffice_profiles():
+    """No processo filho de um fork, os perfis continuam sendo do processo pai"""
+    _soffice_profiles.clear()
+    _idle_soffice_profiles.clear()
+
+
+@atexit.register
+def _remove_soffice_profiles():
+    for profile_dir in _soffice_profiles:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_soffice_profiles)
+
+
+@functools.lru_cache(maxsize=1)
+def find_soffice():
+    """Localiza o executável do LibreOffice, se instalado"""
+    return shutil.which('soffice') or shutil.which('libreoffice')
+
+
+@functools.lru_cache(maxsize=1)
+def _load_dependencies():
+    """Importa python-docx, lxml e ReportLab no primeiro uso
+    
+    Importar o módulo fica barato: a conversão pelo LibreOffice não precisa
+    dessas bibliotecas, e o custo só é pago quando o ReportLab é usado.
+    """
+    global Document, DocxTable, DocxParagraph, BODY_BLOCKS_XPATH, HAS_TEXT_XPATH
+    global A4, SimpleDocTemplate, Paragraph, Table, TableStyle
+    global getSampleStyleSheet, ParagraphStyle, colors, TA_LEFT, TA_CENTER, TA_JUSTIFY
+    
+    from docx import Document
+    from docx.table import Table as DocxTable
+    from docx.text.paragraph import Paragraph as DocxParagraph
+    from lxml import etree
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
+    
+    # Seleção dos blocos do corpo em ordem, avaliada pelo lxml
+    BODY_BLOCKS_XPATH = etree.XPath('./w:p | ./w:tbl', namespaces={'w': WORD_NAMESPACE})
+    
+    # Verifica se o parágrafo tem algum texto visível sem concatenar os runs
+    HAS_TEXT_XPATH = etree.XPath('boolean(.//w:t[normalize-space()])', namespaces={'w': WORD_NAMESPACE})
+
+
+@functools.lru_cache(maxsize=4096)
+def _escape_cached(text):
+    """Escapa o texto para ReportLab; textos repetidos (cabeçalhos, rótulos) saem do cache"""
+    return html.escape(text).translate(SPECIAL_CHARS_TABLE)
+
+
+@functools.lru_cache(maxsize=1)
+def get_pdf_styles():
+    """Monta uma única vez a folha de estilos do PDF, compartilhada entre conversores"""
+    _load_dependencies()
+    styles = getSampleStyleSheet()
+    
+    # Estilo para título
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Title'],
+        fontSize=18,
+        spaceAfter=24,
+        textColor=colors.black,
+        alignment=TA_CENTER
+    ))
+    
+    # Estilo para subtítulo
+    styles.add(ParagraphStyle(
+        name='CustomHeading',
+        parent=styles['Heading1'],
+        fontSize=14,
+        spaceAfter=14,
+        spaceBefore=12,
+        textColor=colors.black,
+        alignment=TA_LEFT
+    ))
+    
+    # Estilo para texto normal
+    styles.add(ParagraphStyle(
+        name='CustomNormal',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=12,
+        textColor=colors.black,
+        alignment=TA_JUSTIFY
+    ))
+    
+    return styles
+
+
+@functools.lru_cache(maxsize=1)
+def get_table_style():
+    """Monta uma única vez o estilo das tabelas, reaproveitado por todas elas"""
+    _load_dependencies()
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
 
 
 class DocxToPdf:
     def __init__(self):
         """Inicializa o conversor DOCX para PDF"""
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
+        self.soffice_path = find_soffice()
     
-    def setup_custom_styles(self):
-        """Configura estilos personalizados para o PDF"""
-        # Estilo para título
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Title'],
-            fontSize=18,
-            spaceAfter=12,
-            textColor=colors.black,
-            alignment=TA_CENTER
-        ))
-        
-        # Estilo para subtítulo
-        self.styles.add(ParagraphStyle(
-            name='CustomHeading',
-            parent=self.styles['Heading1'],
-            fontSize=14,
-            spaceAfter=8,
-            spaceBefore=12,
-            textColor=colors.black,
-            alignment=TA_LEFT
-        ))
-        
-        # Estilo para texto normal
-        self.styles.add(ParagraphStyle(
-            name='CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6,
-            textColor=colors.black,
-            alignment=TA_JUSTIFY
-        ))
+    @property
+    def styles(self):
+        """Folha de estilos do PDF, criada só quando o ReportLab é usado"""
+        return get_pdf_styles()
     
     def _escape_special_chars(self, text):
         """Escapa caracteres especiais para ReportLab"""
         if not text:
             return ""
         
-        # Garante que é uma string
-        if not isinstance(text, str):
-            text = str(text)
-        
-        # Escapa caracteres XML/HTML
-        import html
-        escaped = html.escape(text)
-        
-        # Remove ou substitui caracteres problemáticos
-        escaped = escaped.replace('\x91', "'")  # Apostrofe curvo esquerdo
-        escaped = escaped.replace('\x92', "'")  # Apostrofe curvo direito  
-        escaped = escaped.replace('\x93', '"')  # Aspas curvas esquerdas
-        escaped = escaped.replace('\x94', '"')  # Aspas curvas direitas
-        escaped = escaped.replace('\x96', '-')  # Hífen longo
-        escaped = escaped.replace('\x97', '--') # Hífen extra longo
-        
-        return escaped
+        # Escapa caracteres XML/HTML e substitui os problemáticos
+        try:
+            return _escape_cached(text)
+        except (AttributeError, TypeError):
+            # Não é uma string
+            return _escape_cached(str(text))
     
     def extract_text_from_docx(self, docx_path):
-        """Extrai texto de um arquivo DOCX"""
+        """Extrai texto de um arquivo DOCX (caminho ou objeto arquivo binário)"""
         try:
-            # Verifica se o arquivo existe e é válido
-            if not os.path.exists(docx_path):
-                logging.error(f"Arquivo não encontrado: {docx_path}")
-                return None
-                
+            _load_dependencies()
+            
             # Tenta abrir o documento
             try:
-                doc = Document(docx_path)
+                if isinstance(docx_path, (str, os.PathLike)):
+                    with open(docx_path, 'rb', buffering=DOCX_READ_BUFFER_SIZE) as docx_file:
+                        doc = Document(docx_file)
+                else:
+                    doc = Document(docx_path)
+            except FileNotFoundError:
+                logging.error(f"Arquivo não encontrado: {docx_path}")
+                return None
             except Exception as e:
                 logging.error(f"Erro ao abrir documento DOCX: {str(e)}")
                 return None
                 
             text_content = []
+            normalize = unicodedata.normalize
+            
+            blocks = BODY_BLOCKS_XPATH(doc.element.body)
             
             # Adiciona conteúdo padrão se documento estiver vazio
-            if not doc.paragraphs and not doc.tables:
+            if not blocks:
                 text_content.append(('normal', 'Documento convertido de DOCX'))
                 return text_content
             
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    # Limpa o texto para evitar problemas de encoding
-                    clean_text = paragraph.text.encode('utf-8', errors='ignore').decode('utf-8')
+            # Percorre parágrafos e tabelas na ordem em que aparecem no documento
+            for block in blocks:
+                if block.tag == PARAGRAPH_TAG:
+                    # Parágrafos em branco são descartados antes de montar o texto
+                    if not HAS_TEXT_XPATH(block):
+                        continue
                     
-                    # Verifica o estilo do parágrafo para determinar formatação
-                    style_name = paragraph.style.name.lower()
+                    paragraph = DocxParagraph(block, doc)
                     
-                    if 'title' in style_name:
-                        text_content.append(('title', clean_text))
-                    elif 'heading' in style_name:
-                        text_content.append(('heading', clean_text))
-                    else:
-                        text_content.append(('normal', clean_text))
-            
-            # Processa tabelas se existirem
-            for table in doc.tables:
-                table_data = []
-                for row in table.rows:
-                    row_data = []
-                    for cell in row.cells:
-                        # Limpa o texto da célula
-                        clean_cell_text = cell.text.strip().encode('utf-8', errors='ignore').decode('utf-8')
-                        row_data.append(clean_cell_text)
-                    table_data.append(row_data)
-                if table_data:
-                    text_content.append(('table', table_data))
+                    # Remove nulos e normaliza acentos decompostos (NFC)
+                    clean_text = normalize('NFC', paragraph.text.translate(NUL_STRIP_TABLE))
+                    
+                    # Verifica o estilo do parágrafo para determinar formatação
+                    match = STYLE_KIND_RE.search(paragraph.style.name)
+                    kind = match.group(0).lower() if match else 'normal'
+                    text_content.append((kind, clean_text))
+                else:
+                    table = DocxTable(block, doc)
+                    table_data = []
+                    for row in table.rows:
+                        row_data = []
+                        for cell in row.cells:
+                            # Limpa o texto da célula
+                            clean_cell_text = normalize('NFC', cell.text.strip().translate(NUL_STRIP_TABLE))
+                            row_data.append(clean_cell_text)
+                        table_data.append(row_data)
+                    if table_data:
+                        text_content.append(('table', table_data))
                     
             return text_content
             
@@ -133,56 +269,44 @@ class DocxToPdf:
             logging.error(f"Erro ao extrair texto do DOCX: {str(e)}")
             return None
     
+    def _build_table(self, data):
+        """Cria a tabela do PDF escapando caracteres especiais das células"""
+        # Escapa todas as células numa única passada e remonta as linhas
+        escaped = map(self._escape_special_chars, itertools.chain.from_iterable(data))
+        safe_table_data = [list(itertools.islice(escaped, len(row))) for row in data]
+        
+        table = Table(safe_table_data, spaceAfter=12)
+        table.setStyle(get_table_style())
+        return table
+    
     def create_pdf_from_content(self, content, pdf_path):
-        """Cria um PDF a partir do conteúdo extraído"""
+        """Cria um PDF a partir do conteúdo extraído (caminho ou objeto arquivo binário)"""
         try:
+            _load_dependencies()
+            
             doc = SimpleDocTemplate(pdf_path, pagesize=A4, 
                                   rightMargin=72, leftMargin=72,
                                   topMargin=72, bottomMargin=18)
             
-            story = []
+            # Resolve estilos e métodos uma vez, fora do laço
+            title_style = self.styles['CustomTitle']
+            heading_style = self.styles['CustomHeading']
+            normal_style = self.styles['CustomNormal']
+            escape = self._escape_special_chars
             
-            for content_type, data in content:
-                if content_type == 'title':
-                    # Escapa caracteres especiais para ReportLab
-                    safe_text = self._escape_special_chars(data)
-                    story.append(Paragraph(safe_text, self.styles['CustomTitle']))
-                    story.append(Spacer(1, 12))
-                    
-                elif content_type == 'heading':
-                    safe_text = self._escape_special_chars(data)
-                    story.append(Paragraph(safe_text, self.styles['CustomHeading']))
-                    story.append(Spacer(1, 6))
-                    
-                elif content_type == 'normal':
-                    safe_text = self._escape_special_chars(data)
-                    story.append(Paragraph(safe_text, self.styles['CustomNormal']))
-                    story.append(Spacer(1, 6))
-                    
-                elif content_type == 'table':
-                    # Cria tabela no PDF
-                    if data and len(data) > 0:
-                        # Processa dados da tabela para escapar caracteres especiais
-                        safe_table_data = []
-                        for row in data:
-                            safe_row = [self._escape_special_chars(cell) for cell in row]
-                            safe_table_data.append(safe_row)
-                            
-                        table = Table(safe_table_data)
-                        table.setStyle(TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 10),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                            ('FONTSIZE', (0, 1), (-1, -1), 9),
-                            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                        ]))
-                        story.append(table)
-                        story.append(Spacer(1, 12))
+            # Construtor de flowable para cada tipo de conteúdo
+            builders = {
+                'title': lambda data: Paragraph(escape(data), title_style),
+                'heading': lambda data: Paragraph(escape(data), heading_style),
+                'normal': lambda data: Paragraph(escape(data), normal_style),
+                'table': self._build_table,
+            }
+            
+            story = [
+                builders[content_type](data)
+                for content_type, data in content
+                if content_type in builders and data
+            ]
             
             # Constrói o PDF
             doc.build(story)
@@ -191,6 +315,130 @@ class DocxToPdf:
         except Exception as e:
             logging.error(f"Erro ao criar PDF: {str(e)}")
             return False
+        
+        finally:
+            # Limita a memória do cache ao documento atual
+            _escape_cached.cache_clear()
+    
+    def _convert_with_reportlab(self, docx_path, pdf_path):
+        """Converte um arquivo DOCX para PDF reconstruindo o conteúdo com ReportLab"""
+        # Extrai conteúdo do DOCX
+        content = self.extract_text_from_docx(docx_path)
+        if not content:
+            logging.error("Falha ao extrair conteúdo do DOCX")
+            return False
+        
+        # Cria o PDF
+        return self.create_pdf_from_content(content, pdf_path)
+    
+    def _deliver_pdf(self, generated_path, pdf_path):
+        """Move o PDF gerado para o destino, que pode ser um caminho ou objeto arquivo"""
+        if hasattr(pdf_path, 'write'):
+            with open(generated_path, 'rb') as pdf_file:
+                shutil.copyfileobj(pdf_file, pdf_path)
+        else:
+            shutil.move(generated_path, pdf_path)
+    
+    def _run_soffice(self, docx_paths, out_dir):
+        """Executa uma única chamada do LibreOffice headless para vários arquivos"""
+        profile_dir = _acquire_soffice_profile()
+        command = [
+            self.soffice_path,
+            f'-env:UserInstallation={Path(profile_dir).as_uri()}',
+            '--headless',
+            '--norestore',
+            '--convert-to', 'pdf',
+            '--outdir', out_dir,
+        ] + list(docx_paths)
+        
+        try:
+            subprocess.run(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=SOFFICE_TIMEOUT,
+                check=True
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logging.error(f"Erro ao executar o LibreOffice: {str(e)}")
+            # Um soffice interrompido pode deixar o perfil travado ou pela metade
+            _discard_soffice_profile(profile_dir)
+            return False
+        _idle_soffice_profiles.append(profile_dir)
+        return True
+    
+    def convert_batch(self, docx_paths, out_dir):
+        """Converte vários arquivos DOCX para PDF em lote
+        
+        Usa uma única chamada do LibreOffice headless para todos os arquivos,
+        pagando o custo de inicialização uma só vez. Sem o LibreOffice
+        instalado, ou para os arquivos que ele não converteu (erro ou
+        timeout), a conversão é feita com ReportLab.
+        
+        Os PDFs recebem o nome do DOCX; entradas com o mesmo nome ganham um
+        sufixo (-2, -3, ...) para não sobrescreverem umas às outras.
+        
+        Retorna a lista de caminhos dos PDFs gerados, na mesma ordem da
+        entrada, com None para os arquivos que falharam.
+        """
+        if not docx_paths:
+            return []
+        
+        os.makedirs(out_dir, exist_ok=True)
+        stems = self._unique_stems(docx_paths)
+        pdf_paths = [os.path.join(out_dir, stem + '.pdf') for stem in stems]
+        
+        if self.soffice_path:
+            # Remove PDFs antigos para não confundi-los com a saída desta conversão
+            for pdf_path in pdf_paths:
+                try:
+                    os.unlink(pdf_path)
+                except FileNotFoundError:
+                    pass
+            
+            with tempfile.TemporaryDirectory() as stage_dir:
+                # O LibreOffice nomeia a saída pelo arquivo de entrada: as entradas
+                # renomeadas vão por uma cópia com o nome único
+                soffice_inputs = []
+                for docx_path, stem in zip(docx_paths, stems):
+                    if os.path.splitext(os.path.basename(docx_path))[0] != stem:
+                        staged = os.path.join(stage_dir, stem + os.path.splitext(docx_path)[1])
+                        shutil.copyfile(docx_path, staged)
+                        docx_path = staged
+                    soffice_inputs.append(docx_path)
+                
+                self._run_soffice(soffice_inputs, out_dir)
+        
+        results = []
+        for docx_path, pdf_path in zip(docx_paths, pdf_paths):
+            if os.path.exists(pdf_path):
+                results.append(pdf_path)
+                continue
+            
+            if self.soffice_path:
+                logging.warning(f"LibreOffice não gerou o PDF para {docx_path}; usando ReportLab")
+            try:
+                converted = self._convert_with_reportlab(docx_path, pdf_path)
+            except Exception as e:
+                logging.error(f"Erro ao converter com ReportLab: {docx_path}: {str(e)}")
+                converted = False
+            results.append(pdf_path if converted else None)
+        return results
+    
+    @staticmethod
+    def _unique_stems(docx_paths):
+        """Nomes (sem extensão) dos PDFs de saída, únicos mesmo sem diferenciar maiúsculas"""
+        stems = []
+        used = set()
+        for docx_path in docx_paths:
+            base = os.path.splitext(os.path.basename(docx_path))[0]
+            stem, suffix = base, 1
+            while stem.lower() in used:
+                suffix += 1
+                stem = f'{base}-{suffix}'
+            used.add(stem.lower())
+            stems.append(stem)
+        return stems
     
     def convert_docx_to_pdf(self, docx_path, pdf_path):
         """Converte um arquivo DOCX para PDF"""
@@ -202,14 +450,14 @@ class DocxToPdf:
                 logging.error(f"Arquivo DOCX não encontrado: {docx_path}")
                 return False
             
-            # Extrai conteúdo do DOCX
-            content = self.extract_text_from_docx(docx_path)
-            if not content:
-                logging.error("Falha ao extrair conteúdo do DOCX")
-                return False
-            
-            # Cria o PDF
-            success = self.create_pdf_from_content(content, pdf_path)
+            if self.soffice_path:
+                with tempfile.TemporaryDirectory() as out_dir:
+                    generated = self.convert_batch([docx_path], out_dir)[0]
+                    if generated:
+                        self._deliver_pdf(generated, pdf_path)
+                    success = generated is not None
+            else:
+                success = self._convert_with_reportlab(docx_path, pdf_path)
             
             if success:
                 logging.info(f"Conversão realizada com sucesso: {pdf_path}")
@@ -223,27 +471,54 @@ class DocxToPdf:
             return False
     
     def convert_docx_content_to_pdf(self, docx_file_content, pdf_path):
-        """Converte conteúdo de arquivo DOCX (bytes) para PDF"""
+        """Converte conteúdo de arquivo DOCX (bytes) para PDF
+        
+        pdf_path pode ser um caminho ou um objeto arquivo binário (ex.: BytesIO).
+        """
         try:
-            # Cria arquivo temporário para o DOCX
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_docx:
-                temp_docx.write(docx_file_content)
-                temp_docx_path = temp_docx.name
+            if not self.soffice_path:
+                # Sem LibreOffice, o python-docx lê os bytes direto da memória
+                content = self.extract_text_from_docx(io.BytesIO(docx_file_content))
+                if not content:
+                    logging.error("Falha ao extrair conteúdo do DOCX")
+                    return False
+                return self.create_pdf_from_content(content, pdf_path)
             
-            # Converte para PDF
-            result = self.convert_docx_to_pdf(temp_docx_path, pdf_path)
-            
-            # Remove arquivo temporário
-            try:
-                os.unlink(temp_docx_path)
-            except Exception:
-                pass
+            # O LibreOffice precisa do DOCX em disco: grava num diretório temporário
+            # e o envia para a conversão em lote
+            with tempfile.TemporaryDirectory() as work_dir:
+                docx_path = os.path.join(work_dir, 'documento.docx')
+                with open(docx_path, 'wb') as docx_file:
+                    docx_file.write(docx_file_content)
+                
+                generated = self.convert_batch([docx_path], work_dir)[0]
+                if not generated:
+                    logging.error("Falha ao criar PDF")
+                    return False
+                
+                self._deliver_pdf(generated, pdf_path)
             
-            return result
+            logging.info(f"Conversão realizada com sucesso: {pdf_path}")
+            return True
             
         except Exception as e:
             logging.error(f"Erro na conversão de conteúdo DOCX: {str(e)}")
             return False
+    
+    def convert_docx_content_to_stream(self, docx_file_content):
+        """Converte conteúdo de arquivo DOCX (bytes) para um PDF pronto para envio
+        
+        O PDF é gerado num SpooledTemporaryFile, que só vai para disco acima de
+        PDF_SPOOL_MAX_SIZE. Retorna o arquivo posicionado no início (o chamador
+        deve fechá-lo) ou None em caso de falha.
+        """
+        pdf_stream = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
+        if not self.convert_docx_content_to_pdf(docx_file_content, pdf_stream):
+            pdf_stream.close()
+            return None
+        
+        pdf_stream.seek(0)
+        return pdf_stream
 
 
 def main():
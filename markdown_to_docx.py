@@ -1,20 +1,84 @@
-import markdown2
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.shared import OxmlElement, qn
+import io
 import re
-import os
+from html import unescape
 import argparse
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple, Union, BinaryIO
 from pathlib import Path
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# A configuração do logging fica a cargo da aplicação que importa o módulo
 logger = logging.getLogger(__name__)
 
+# cmarkgfm (opcional): parser GFM em C, bem mais rápido que o markdown2
+try:
+    import cmarkgfm
+    from cmarkgfm.cmark import Options as CmarkOptions
+    CMARKGFM_AVAILABLE = True
+except ImportError:
+    CMARKGFM_AVAILABLE = False
+
+# Extensões GFM equivalentes aos extras do markdown2 (blocos cercados já são CommonMark)
+_CMARK_EXTENSIONS = ['table', 'strikethrough', 'tasklist']
+
+# Estilos customizados do documento: nome -> formatação de fonte e parágrafo
+# (espaçamentos em pontos, recuos em polegadas)
+_STYLE_SPECS = (
+    # Título principal (Heading 1)
+    ('Custom Title', {
+        'font': 'Calibri', 'size': 24, 'bold': True, 'color': (44, 62, 80),  # #2c3e50
+        'space_after': 18, 'space_before': 6,
+    }),
+    # Subtítulos (Heading 2)
+    ('Custom Heading 2', {
+        'font': 'Calibri', 'size': 18, 'bold': True, 'color': (52, 73, 94),  # #34495e
+        'space_after': 12, 'space_before': 6,
+    }),
+    # Heading 3
+    ('Custom Heading 3', {
+        'font': 'Calibri', 'size': 14, 'bold': True, 'color': (52, 73, 94),  # #34495e
+        'space_after': 8, 'space_before': 4,
+    }),
+    # Texto normal customizado
+    ('Custom Normal', {
+        'font': 'Calibri', 'size': 11,
+        'space_after': 6, 'line_spacing': 1.15,
+    }),
+    # Código
+    ('Custom Code', {
+        'font': 'Courier New', 'size': 9,
+        'space_after': 6, 'left_indent': 0.3,
+    }),
+    # Citações
+    ('Custom Quote', {
+        'font': 'Calibri', 'size': 11, 'italic': True, 'color': (93, 109, 126),  # #5d6d7e
+        'space_after': 6, 'left_indent': 0.5, 'right_indent': 0.5,
+    }),
+)
+
+# Tipos de formatação inline (índices do contador de aninhamento)
+_FMT_BOLD, _FMT_ITALIC, _FMT_CODE = 0, 1, 2
+
+# Tags de formatação inline reconhecidas em _split_formatted_text; as demais
+# (<p>, <li>, <a>, ...) são descartadas mantendo o texto
+_INLINE_TAGS = {
+    'strong': _FMT_BOLD,
+    'b': _FMT_BOLD,
+    'em': _FMT_ITALIC,
+    'i': _FMT_ITALIC,
+    'code': _FMT_CODE,
+}
+
+# Onde termina o texto próprio de um <li> (o resto é outro item ou sublista)
+_LIST_ITEM_STOPS = ('<li>', '</li>', '<ul', '<ol')
+
+# Qualquer tag HTML (compilado uma vez, na carga do módulo)
+_ANY_TAG_RE = re.compile(r'<[^>]+>')
+
 
 class MarkdownToDocx:
     """
@@ -22,90 +86,67 @@ class MarkdownToDocx:
     Compatível com Windows e não requer dependências externas complexas.
     """
     
+    # Modelo .docx com os estilos customizados, gerado uma vez por processo
+    _TEMPLATE_DOCX: Optional[bytes] = None
+    
     def __init__(self):
         """
         Inicializa o conversor.
         """
         self.doc = None
         
-    def _setup_document_styles(self):
-        """
-        Configura estilos customizados para o documento Word.
+    def _new_document(self):
         """
-        # Estilo para título principal (Heading 1)
-        if 'Custom Title' not in [style.name for style in self.doc.styles]:
-            title_style = self.doc.styles.add_style('Custom Title', WD_STYLE_TYPE.PARAGRAPH)
-            title_format = title_style.paragraph_format
-            title_format.space_after = Pt(18)
-            title_format.space_before = Pt(6)
-            
-            title_font = title_style.font
-            title_font.name = 'Calibri'
-            title_font.size = Pt(24)
-            title_font.bold = True
-            title_font.color.rgb = RGBColor(44, 62, 80)  # #2c3e50
+        Cria um documento vazio a partir do modelo com os estilos já configurados.
         
-        # Estilo para subtítulos (Heading 2)
-        if 'Custom Heading 2' not in [style.name for style in self.doc.styles]:
-            h2_style = self.doc.styles.add_style('Custom Heading 2', WD_STYLE_TYPE.PARAGRAPH)
-            h2_format = h2_style.paragraph_format
-            h2_format.space_after = Pt(12)
-            h2_format.space_before = Pt(6)
-            
-            h2_font = h2_style.font
-            h2_font.name = 'Calibri'
-            h2_font.size = Pt(18)
-            h2_font.bold = True
-            h2_font.color.rgb = RGBColor(52, 73, 94)  # #34495e
+        Na primeira chamada o modelo é montado (Document() + _setup_document_styles)
+        e guardado como bytes na classe; as conversões seguintes só o carregam.
         
-        # Estilo para heading 3
-        if 'Custom Heading 3' not in [style.name for style in self.doc.styles]:
-            h3_style = self.doc.styles.add_style('Custom Heading 3', WD_STYLE_TYPE.PARAGRAPH)
-            h3_format = h3_style.paragraph_format
-            h3_format.space_after = Pt(8)
-            h3_format.space_before = Pt(4)
-            
-            h3_font = h3_style.font
-            h3_font.name = 'Calibri'
-            h3_font.size = Pt(14)
-            h3_font.bold = True
-            h3_font.color.rgb = RGBColor(52, 73, 94)  # #34495e
+        Returns:
+            Document: Documento pronto para receber o conteúdo
+        """
+        cls = type(self)
+        if cls._TEMPLATE_DOCX is None:
+            self.doc = Document()
+            self._setup_document_styles()
+            buffer = io.BytesIO()
+            self.doc.save(buffer)
+            cls._TEMPLATE_DOCX = buffer.getvalue()
+        return Document(io.BytesIO(cls._TEMPLATE_DOCX))
+    
+    def _setup_document_styles(self):
+        """
+        Configura estilos customizados para o documento Word (ver _STYLE_SPECS).
+        """
+        # Um único passe pelos estilos existentes; depois, busca O(1) por nome
+        existing = {style.name for style in self.doc.styles}
         
-        # Estilo para texto normal customizado
-        if 'Custom Normal' not in [style.name for style in self.doc.styles]:
-            normal_style = self.doc.styles.add_style('Custom Normal', WD_STYLE_TYPE.PARAGRAPH)
-            normal_format = normal_style.paragraph_format
-            normal_format.space_after = Pt(6)
-            normal_format.line_spacing = 1.15
+        for name, spec in _STYLE_SPECS:
+            if name in existing:
+                continue
             
-            normal_font = normal_style.font
-            normal_font.name = 'Calibri'
-            normal_font.size = Pt(11)
-        
-        # Estilo para código
-        if 'Custom Code' not in [style.name for style in self.doc.styles]:
-            code_style = self.doc.styles.add_style('Custom Code', WD_STYLE_TYPE.PARAGRAPH)
-            code_format = code_style.paragraph_format
-            code_format.space_after = Pt(6)
-            code_format.left_indent = Inches(0.3)
+            style = self.doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
             
-            code_font = code_style.font
-            code_font.name = 'Courier New'
-            code_font.size = Pt(9)
-        
-        # Estilo para citações
-        if 'Custom Quote' not in [style.name for style in self.doc.styles]:
-            quote_style = self.doc.styles.add_style('Custom Quote', WD_STYLE_TYPE.PARAGRAPH)
-            quote_format = quote_style.paragraph_format
-            quote_format.space_after = Pt(6)
-            quote_format.left_indent = Inches(0.5)
-            quote_format.right_indent = Inches(0.5)
+            style_format = style.paragraph_format
+            style_format.space_after = Pt(spec['space_after'])
+            if 'space_before' in spec:
+                style_format.space_before = Pt(spec['space_before'])
+            if 'line_spacing' in spec:
+                style_format.line_spacing = spec['line_spacing']
+            if 'left_indent' in spec:
+                style_format.left_indent = Inches(spec['left_indent'])
+            if 'right_indent' in spec:
+                style_format.right_indent = Inches(spec['right_indent'])
             
-            quote_font = quote_style.font
-            quote_font.name = 'Calibri'
-            quote_font.size = Pt(11)
-            quote_font.italic = True
-            quote_font.color.rgb = RGBColor(93, 109, 126)  # #5d6d7e
+            style_font = style.font
+            style_font.name = spec['font']
+            style_font.size = Pt(spec['size'])
+            if spec.get('bold'):
+                style_font.bold = True
+            if spec.get('italic'):
+                style_font.italic = True
+            if 'color' in spec:
+                style_font.color.rgb = RGBColor(*spec['color'])
     
     def _add_border_to_paragraph(self, paragraph):
         """
@@ -132,117 +173,152 @@ class MarkdownToDocx:
         Args:
             markdown_text (str): Texto em formato Markdown
         """
-        # Converte Markdown para HTML
-        html = markdown2.markdown(
-            markdown_text,
-            extras=['fenced-code-blocks', 'tables', 'strike', 'task_list']
-        )
-        
-        # Divide o HTML em linhas para processamento
-        lines = html.split('\n')
+        # Converte Markdown para HTML (cmarkgfm quando instalado, senão markdown2);
+        # UNSAFE mantém o HTML bruto do Markdown, como o markdown2 já fazia
+        if CMARKGFM_AVAILABLE:
+            html = cmarkgfm.markdown_to_html_with_extensions(
+                markdown_text,
+                options=CmarkOptions.CMARK_OPT_UNSAFE,
+                extensions=_CMARK_EXTENSIONS
+            )
+        else:
+            import markdown2  # importado só quando usado (cold start mais leve)
+            html = markdown2.markdown(
+                markdown_text,
+                extras=['fenced-code-blocks', 'tables', 'strike', 'task_list']
+            )
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            if not line:
-                i += 1
-                continue
+        # Percorre o HTML com um cursor: cada bloco é localizado com str.find e
+        # fatiado direto, sem dividir o HTML inteiro em linhas
+        pos = 0
+        end = len(html)
+        while pos < end:
+            # Pula espaços e quebras de linha entre os blocos
+            while pos < end and html[pos] in ' \t\r\n':
+                pos += 1
+            if pos >= end:
+                break
             
             # Cabeçalhos
-            if line.startswith('<h1>') and line.endswith('</h1>'):
-                title = self._clean_html_tags(line)
+            if html.startswith('<h1>', pos):
+                close = self._find_close(html, '</h1>', pos + 4)
+                title = self._clean_html_tags(html[pos + 4:close])
                 paragraph = self.doc.add_paragraph(title, style='Custom Title')
+                pos = close + 5
                 
-            elif line.startswith('<h2>') and line.endswith('</h2>'):
-                title = self._clean_html_tags(line)
+            elif html.startswith('<h2>', pos):
+                close = self._find_close(html, '</h2>', pos + 4)
+                title = self._clean_html_tags(html[pos + 4:close])
                 paragraph = self.doc.add_paragraph(title, style='Custom Heading 2')
+                pos = close + 5
                 
-            elif line.startswith('<h3>') and line.endswith('</h3>'):
-                title = self._clean_html_tags(line)
+            elif html.startswith('<h3>', pos):
+                close = self._find_close(html, '</h3>', pos + 4)
+                title = self._clean_html_tags(html[pos + 4:close])
                 paragraph = self.doc.add_paragraph(title, style='Custom Heading 3')
+                pos = close + 5
             
             # Bloco de código
-            elif line.startswith('<pre><code>'):
-                # Coleta todo o bloco de código
-                code_lines = []
-                if line.endswith('</code></pre>'):
-                    # Código em uma linha
-                    code_content = line.replace('<pre><code>', '').replace('</code></pre>', '')
-                    paragraph = self.doc.add_paragraph(code_content, style='Custom Code')
-                else:
-                    # Código em múltiplas linhas
-                    code_lines.append(line.replace('<pre><code>', ''))
-                    i += 1
-                    while i < len(lines) and not lines[i].strip().endswith('</code></pre>'):
-                        code_lines.append(lines[i])
-                        i += 1
-                    if i < len(lines):
-                        code_lines.append(lines[i].replace('</code></pre>', ''))
-                    
-                    code_content = '\n'.join(code_lines)
-                    paragraph = self.doc.add_paragraph(code_content, style='Custom Code')
+            elif html.startswith('<pre><code>', pos):
+                close = self._find_close(html, '</code></pre>', pos + 11)
+                code_content = html[pos + 11:close]
+                if '&' in code_content:
+                    code_content = unescape(code_content)
+                paragraph = self.doc.add_paragraph(code_content, style='Custom Code')
+                pos = close + 13
                 
             # Blockquote
-            elif line.startswith('<blockquote>'):
-                quote_lines = []
-                if line.endswith('</blockquote>'):
-                    quote_content = line.replace('<blockquote>', '').replace('</blockquote>', '')
-                    paragraph = self.doc.add_paragraph(self._clean_html_tags(quote_content), style='Custom Quote')
-                    self._add_border_to_paragraph(paragraph)
-                else:
-                    quote_lines.append(line.replace('<blockquote>', ''))
-                    i += 1
-                    while i < len(lines) and not lines[i].strip().endswith('</blockquote>'):
-                        quote_lines.append(lines[i])
-                        i += 1
-                    if i < len(lines):
-                        quote_lines.append(lines[i].replace('</blockquote>', ''))
-                    
-                    quote_content = ' '.join(quote_lines)
-                    paragraph = self.doc.add_paragraph(self._clean_html_tags(quote_content), style='Custom Quote')
-                    self._add_border_to_paragraph(paragraph)
+            elif html.startswith('<blockquote>', pos):
+                close = self._find_close(html, '</blockquote>', pos + 12)
+                quote_content = html[pos + 12:close].replace('\n', ' ')
+                paragraph = self.doc.add_paragraph(self._clean_html_tags(quote_content), style='Custom Quote')
+                self._add_border_to_paragraph(paragraph)
+                pos = close + 13
             
             # Lista
-            elif line.startswith('<ul>') or line.startswith('<ol>'):
-                # Processa lista
-                i += 1
-                while i < len(lines) and not (lines[i].strip() == '</ul>' or lines[i].strip() == '</ol>'):
-                    if lines[i].strip().startswith('<li>'):
-                        item_text = self._clean_html_tags(lines[i].strip())
-                        paragraph = self.doc.add_paragraph(item_text, style='List Bullet')
-                    i += 1
+            elif html.startswith('<ul>', pos) or html.startswith('<ol>', pos):
+                # Processa os itens até o fechamento correspondente (contando as
+                # listas aninhadas); cada <li>, de qualquer nível, vira um item
+                close = self._find_list_close(html, pos)
+                # Estilo buscado uma vez por lista, não a cada item
+                bullet_style = self.doc.styles['List Bullet']
+                item = html.find('<li>', pos + 4, close)
+                while item >= 0:
+                    # Texto do próprio item: até o próximo <li>, </li> ou sublista
+                    item_end = min(self._find_close(html, tag, item + 4, close) for tag in _LIST_ITEM_STOPS)
+                    item_text = self._clean_html_tags(html[item + 4:item_end])
+                    paragraph = self.doc.add_paragraph(style=bullet_style)
+                    if item_text:
+                        paragraph.add_run(item_text)
+                    item = html.find('<li>', item_end, close)
+                pos = close + 5
             
             # Parágrafo normal
-            elif line.startswith('<p>') and line.endswith('</p>'):
-                text = self._clean_html_tags(line)
-                paragraph = self.doc.add_paragraph(text, style='Custom Normal')
-                self._apply_text_formatting(paragraph, text)
+            elif html.startswith('<p>', pos):
+                close = self._find_close(html, '</p>', pos + 3)
+                line = html[pos:close + 4]
+                paragraph = self.doc.add_paragraph(style='Custom Normal')
+                self._apply_text_formatting(paragraph, self._split_formatted_text(line))
+                pos = close + 4
             
-            # Outros elementos como texto simples
+            # Outros elementos como texto simples, linha a linha
             else:
-                clean_text = self._clean_html_tags(line)
+                line_end = self._find_close(html, '\n', pos)
+                # O cursor já pulou o espaço inicial; basta cortar o final
+                line = html[pos:line_end].rstrip()
+                # Um único passe dá o texto limpo (linha vazia?) e os runs
+                clean_text, runs = self._strip_and_runs(line)
                 if clean_text:
-                    paragraph = self.doc.add_paragraph(clean_text, style='Custom Normal')
-                    self._apply_text_formatting(paragraph, line)
-            
-            i += 1
+                    paragraph = self.doc.add_paragraph(style='Custom Normal')
+                    self._apply_text_formatting(paragraph, runs)
+                pos = line_end + 1
     
-    def _apply_text_formatting(self, paragraph, original_text):
+    @staticmethod
+    def _find_close(html: str, tag: str, start: int, end: Optional[int] = None) -> int:
+        """
+        Posição da tag de fechamento a partir de 'start' (ou 'end', o fim do
+        trecho, se ela não existir, para que o bloco vá até o fim do HTML).
+        """
+        if end is None:
+            end = len(html)
+        close = html.find(tag, start, end)
+        return end if close < 0 else close
+    
+    @staticmethod
+    def _find_list_close(html: str, start: int) -> int:
+        """
+        Posição do </ul> ou </ol> que fecha a lista aberta em 'start', pulando
+        os fechamentos das listas aninhadas (fim do HTML se não houver).
+        """
+        depth = 0
+        cursor = start
+        while True:
+            opens = [i for i in (html.find('<ul', cursor), html.find('<ol', cursor)) if i >= 0]
+            closes = [i for i in (html.find('</ul>', cursor), html.find('</ol>', cursor)) if i >= 0]
+            if not closes:
+                return len(html)
+            next_close = min(closes)
+            if opens and min(opens) < next_close:
+                depth += 1
+                cursor = min(opens) + 3
+            else:
+                depth -= 1
+                if depth == 0:
+                    return next_close
+                cursor = next_close + 5
+    
+    def _apply_text_formatting(self, paragraph, runs):
         """
         Aplica formatação de texto (negrito, itálico) ao parágrafo.
         
         Args:
             paragraph: Parágrafo do documento Word
-            original_text: Texto original com tags HTML
+            runs: Trechos (texto, negrito, itálico, código), como os gerados
+                por _split_formatted_text
         """
-        # Limpa o parágrafo atual
-        paragraph.clear()
-        
-        # Encontra formatações no texto original
-        parts = self._split_formatted_text(original_text)
-        
-        for part_text, is_bold, is_italic, is_code in parts:
+        # Cada trecho vira um run assim que é recebido; com o gerador do
+        # scanner não há lista intermediária
+        for part_text, is_bold, is_italic, is_code in runs:
             run = paragraph.add_run(part_text)
             if is_bold:
                 run.bold = True
@@ -256,72 +332,78 @@ class MarkdownToDocx:
         """
         Divide o texto em partes com suas respectivas formatações.
         
-        Returns:
-            List[Tuple[str, bool, bool, bool]]: (texto, negrito, itálico, código)
-        """
-        parts = []
-        current_pos = 0
-        
-        # Padrões de formatação
-        patterns = [
-            (r'<strong>(.*?)</strong>', 'bold'),
-            (r'<b>(.*?)</b>', 'bold'),
-            (r'<em>(.*?)</em>', 'italic'),
-            (r'<i>(.*?)</i>', 'italic'),
-            (r'<code>(.*?)</code>', 'code')
-        ]
-        
-        # Remove tags básicas primeiro
-        text = self._clean_basic_tags(text)
-        
-        # Encontra todas as formatações
-        matches = []
-        for pattern, format_type in patterns:
-            for match in re.finditer(pattern, text):
-                matches.append((match.start(), match.end(), match.group(1), format_type))
+        Percorre o texto uma única vez, de tag em tag (str.find), ligando e
+        desligando negrito/itálico/código conforme abre e fecha <strong>/<b>,
+        <em>/<i> e <code>. Outras tags são removidas; formatações aninhadas
+        se acumulam. As partes são geradas à medida que o texto é percorrido.
         
-        # Ordena por posição
-        matches.sort()
+        Yields:
+            Tuple[str, bool, bool, bool]: (texto, negrito, itálico, código)
+        """
+        pieces = []  # trechos de texto com a formatação atual
+        depth = [0, 0, 0]  # aberturas pendentes de cada _FMT_*
         
-        for start, end, content, format_type in matches:
-            # Adiciona texto antes da formatação
-            if start > current_pos:
-                plain_text = text[current_pos:start]
-                plain_text = re.sub(r'<[^>]+>', '', plain_text)
-                if plain_text:
-                    parts.append((plain_text, False, False, False))
+        text = text.strip()
+        pos = 0
+        end = len(text)
+        while pos < end:
+            lt = text.find('<', pos)
+            gt = text.find('>', lt + 1) if lt >= 0 else -1
+            if gt < 0:
+                # Sem mais tags: o resto é texto
+                pieces.append(text[pos:])
+                break
             
-            # Adiciona texto formatado
-            is_bold = format_type == 'bold'
-            is_italic = format_type == 'italic'
-            is_code = format_type == 'code'
-            parts.append((content, is_bold, is_italic, is_code))
+            if lt > pos:
+                pieces.append(text[pos:lt])
+            pos = gt + 1
             
-            current_pos = end
-        
-        # Adiciona texto restante
-        if current_pos < len(text):
-            remaining_text = text[current_pos:]
-            remaining_text = re.sub(r'<[^>]+>', '', remaining_text)
-            if remaining_text:
-                parts.append((remaining_text, False, False, False))
+            tag = text[lt + 1:gt]
+            closing = tag.startswith('/')
+            if closing:
+                tag = tag[1:]
+            names = tag.split(None, 1)
+            format_type = _INLINE_TAGS.get(names[0].lower()) if names else None
+            if format_type is None:
+                continue
+            
+            # A formatação muda: fecha o trecho acumulado até aqui
+            if pieces:
+                part_text = ''.join(pieces)
+                pieces = []
+                if part_text:
+                    if '&' in part_text:
+                        part_text = unescape(part_text)
+                    yield part_text, depth[_FMT_BOLD] > 0, depth[_FMT_ITALIC] > 0, depth[_FMT_CODE] > 0
+            
+            if closing:
+                if depth[format_type]:
+                    depth[format_type] -= 1
+            else:
+                depth[format_type] += 1
         
-        return parts
+        if pieces:
+            part_text = ''.join(pieces)
+            if part_text:
+                if '&' in part_text:
+                    part_text = unescape(part_text)
+                yield part_text, depth[_FMT_BOLD] > 0, depth[_FMT_ITALIC] > 0, depth[_FMT_CODE] > 0
     
-    def _clean_basic_tags(self, text: str) -> str:
+    def _strip_and_runs(self, text: str) -> Tuple[str, List[Tuple[str, bool, bool, bool]]]:
         """
-        Remove apenas tags básicas, mantendo formatação.
+        Texto sem tags e trechos formatados da mesma linha, num único passe.
+        
+        Usado onde os dois são necessários, para não varrer a linha duas vezes
+        (regex de _clean_html_tags + scanner de _split_formatted_text).
+        
+        Args:
+            text (str): Texto com tags HTML
+            
+        Returns:
+            Tuple[str, List[Tuple[str, bool, bool, bool]]]: (texto limpo, trechos)
         """
-        # Remove tags básicas mas mantém formatação
-        text = re.sub(r'<p.*?>', '', text)
-        text = re.sub(r'</p>', '', text)
-        text = re.sub(r'<li.*?>', '', text)
-        text = re.sub(r'</li>', '', text)
-        text = re.sub(r'<h[1-6].*?>', '', text)
-        text = re.sub(r'</h[1-6]>', '', text)
-        text = re.sub(r'<blockquote.*?>', '', text)
-        text = re.sub(r'</blockquote>', '', text)
-        return text.strip()
+        runs = list(self._split_formatted_text(text))
+        return ''.join(part[0] for part in runs).strip(), runs
     
     def _clean_html_tags(self, text: str) -> str:
         """
@@ -333,41 +415,69 @@ class MarkdownToDocx:
         Returns:
             str: Texto limpo
         """
-        # Remove todas as tags HTML
-        text = re.sub(r'<[^>]+>', '', text)
-        return text.strip()
+        # Remove todas as tags HTML e decodifica as entidades (&amp;, &lt;, ...);
+        # a maioria das linhas não tem '&' e dispensa o unescape
+        text = _ANY_TAG_RE.sub('', text).strip()
+        if '&' in text:
+            text = unescape(text)
+        return text
     
-    def markdown_text_to_docx(self, markdown_text: str, output_path: str) -> bool:
+    def markdown_text_to_docx_bytes(self, markdown_text: str) -> Optional[bytes]:
         """
-        Converte texto Markdown diretamente para Word (.docx).
+        Converte texto Markdown em Word (.docx) na memória, sem passar pelo disco.
         
         Args:
             markdown_text (str): Texto em formato Markdown
-            output_path (str): Caminho onde salvar o documento gerado
             
         Returns:
-            bool: True se a conversão foi bem-sucedida, False caso contrário
+            Optional[bytes]: Bytes do documento .docx ou None se a conversão falhar
         """
         try:
             logger.info("Iniciando conversão de texto Markdown para Word...")
             
-            # Cria um novo documento
-            self.doc = Document()
-            
-            # Configura os estilos customizados
-            self._setup_document_styles()
+            # Cria um novo documento já com os estilos customizados
+            self.doc = self._new_document()
             
             # Converte Markdown em elementos do documento
             self._parse_markdown_to_document(markdown_text)
             
-            # Salva o documento
-            self.doc.save(output_path)
+            # Salva o documento num buffer em memória
+            buffer = io.BytesIO()
+            self.doc.save(buffer)
+            return buffer.getvalue()
             
-            logger.info(f"Documento Word gerado com sucesso: {output_path}")
+        except Exception as e:
+            logger.error(f"Erro ao converter Markdown para Word: {str(e)}")
+            return None
+    
+    def markdown_text_to_docx(self, markdown_text: str, output_path: Union[str, BinaryIO]) -> bool:
+        """
+        Converte texto Markdown diretamente para Word (.docx).
+        
+        Args:
+            markdown_text (str): Texto em formato Markdown
+            output_path (str | BinaryIO): Caminho onde salvar o documento gerado
+                ou stream binário (ex.: io.BytesIO) que receberá os bytes do .docx
+            
+        Returns:
+            bool: True se a conversão foi bem-sucedida, False caso contrário
+        """
+        docx_bytes = self.markdown_text_to_docx_bytes(markdown_text)
+        if docx_bytes is None:
+            return False
+        
+        try:
+            # Grava os bytes de uma vez no arquivo ou no stream
+            if isinstance(output_path, str):
+                Path(output_path).write_bytes(docx_bytes)
+                logger.info(f"Documento Word gerado com sucesso: {output_path}")
+            else:
+                output_path.write(docx_bytes)
+                logger.info("Documento Word gerado com sucesso em memória")
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao converter Markdown para Word: {str(e)}")
+            logger.error(f"Erro ao salvar o documento Word: {str(e)}")
             return False
     
     def markdown_file_to_docx(self, markdown_file: str, output_path: Optional[str] = None) -> bool:
@@ -382,20 +492,19 @@ class MarkdownToDocx:
             bool: True se a conversão foi bem-sucedida, False caso contrário
         """
         try:
-            # Verifica se o arquivo existe
-            if not os.path.exists(markdown_file):
+            path = Path(markdown_file)
+            
+            # Lê o conteúdo do arquivo Markdown (sem checagem prévia de existência)
+            try:
+                markdown_text = path.read_text(encoding='utf-8')
+            except FileNotFoundError:
                 logger.error(f"Arquivo Markdown não encontrado: {markdown_file}")
                 return False
             
             # Define o caminho de saída se não fornecido
             if output_path is None:
-                path = Path(markdown_file)
                 output_path = str(path.with_suffix('.docx'))
             
-            # Lê o conteúdo do arquivo Markdown
-            with open(markdown_file, 'r', encoding='utf-8') as file:
-                markdown_text = file.read()
-            
             logger.info(f"Convertendo arquivo: {markdown_file} -> {output_path}")
             
             # Converte o texto para Word
@@ -0,0 +1,51 @@
+import io
+import logging
+import os
+import sys
+import unittest
+
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_to_docx import MarkdownToDocx  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+
+def _paragraphs(markdown_text):
+    """Converte o Markdown e devolve (estilo, texto) de cada parágrafo do DOCX"""
+    buffer = io.BytesIO()
+    MarkdownToDocx().markdown_text_to_docx(markdown_text, buffer)
+    buffer.seek(0)
+    doc = Document(buffer)
+    return [(p.style.name, p.text) for p in doc.paragraphs]
+
+
+class TestListas(unittest.TestCase):
+
+    def test_lista_aninhada_mantem_todos_os_itens(self):
+        esperado = [
+            ('List Bullet', 'a'),
+            ('List Bullet', 'b x'),
+            ('List Bullet', 'nested'),
+            ('List Bullet', 'c'),
+        ]
+        self.assertEqual(_paragraphs('- a\n- b x\n    - nested\n- c\n'), esperado)
+        self.assertEqual(_paragraphs('- a\n- b x\n\n    - nested\n\n- c\n'), esperado)
+
+    def test_texto_apos_lista_aninhada(self):
+        self.assertEqual(
+            _paragraphs('1. um\n2. dois\n    - x\n3. tres\n\ndepois\n'),
+            [
+                ('List Bullet', 'um'),
+                ('List Bullet', 'dois'),
+                ('List Bullet', 'x'),
+                ('List Bullet', 'tres'),
+                ('Custom Normal', 'depois'),
+            ]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()